@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .identifiers import resolve_identifier
+
+
+class IdentifierBackend(ModelBackend):
+    """
+    Authenticates ``authenticate(request, identifier=..., password=...)``
+    where the identifier is an email, phone or username. Calls with
+    ``username=`` (Django admin, tests) are left to ModelBackend.
+    """
+
+    def authenticate(self, request, identifier=None, password=None, **kwargs):
+        if identifier is None or password is None:
+            return None
+        user = resolve_identifier(identifier)
+        if user is None:
+            # Hash anyway so unknown identifiers take as long as wrong passwords.
+            get_user_model()().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -3,6 +3,8 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django.core.exceptions import ValidationError
 
+from .identifiers import normalize_phone
+
 
 class RegisterForm(UserCreationForm):
     full_name = forms.CharField(max_length=150, label="Họ và tên")
@@ -52,7 +54,7 @@ class RegisterForm(UserCreationForm):
 
     def clean_phone(self):
         phone_raw = (self.cleaned_data.get("phone") or "").strip()
-        normalized = "".join(ch for ch in phone_raw if ch.isdigit() or ch == "+")
+        normalized = normalize_phone(phone_raw)
         phone = normalized or phone_raw
         if not phone:
             raise ValidationError("Vui lòng nhập số điện thoại.")
@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Case, Q, When
+from django.db.models.functions import Lower
+
+
+def normalize_phone(value):
+    """Keep digits and "+", the form phones are stored in."""
+    return "".join(ch for ch in value if ch.isdigit() or ch == "+")
+
+
+def resolve_identifier(identifier):
+    """
+    Find the account a login identifier (email, phone or username) belongs
+    to with one query: each branch of the OR is served by its own index
+    (LOWER(email), LOWER(username) and the unique phone index), so
+    Postgres answers it with a bitmap OR instead of scanning users.
+
+    When the identifier matches more than one account an exact username
+    wins over an email, and an email over a phone.
+    """
+    identifier = identifier.strip()
+    if not identifier:
+        return None
+    folded = identifier.lower()
+    condition = Q(email_ci=folded) | Q(username_ci=folded)
+    phone = normalize_phone(identifier) if "@" not in identifier else ""
+    if phone:
+        condition |= Q(phone=phone)
+
+    return (
+        get_user_model()
+        .objects.alias(email_ci=Lower("email"), username_ci=Lower("username"))
+        .filter(condition)
+        .order_by(
+            Case(When(username_ci=folded, then=0), When(email_ci=folded, then=1), default=2),
+            "pk",
+        )
+        .first()
+    )
@@ -0,0 +1,81 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+
+from accounts.identifiers import normalize_phone, resolve_identifier
+
+
+class _Rollback(Exception):
+    pass
+
+
+def legacy_lookup(identifier):
+    """The lookup the login views used before accounts.identifiers."""
+    return (
+        get_user_model()
+        .objects.filter(
+            Q(email__iexact=identifier)
+            | Q(phone=normalize_phone(identifier) or identifier)
+            | Q(username__iexact=identifier)
+        )
+        .first()
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic users inside a transaction that is rolled back, then time the "
+        "legacy iexact login lookup against accounts.identifiers.resolve_identifier."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1_000_000)
+        parser.add_argument("--lookups", type=int, default=50)
+
+    def handle(self, *args, **options):
+        users, lookups = options["users"], options["lookups"]
+        try:
+            with transaction.atomic():
+                self._seed(users)
+                step = max(users // lookups, 1)
+                identifiers = []
+                for n in range(1, users + 1, step)[:lookups]:
+                    identifiers += [f"Bench{n}@Example.com", f"07{n:08d}", f"BENCH-USER-{n}"]
+
+                self.stdout.write(f"{'lookup':<12} {'ms/login':>9}  plan")
+                for label, lookup in (("legacy", legacy_lookup), ("indexed", resolve_identifier)):
+                    started = time.perf_counter()
+                    for identifier in identifiers:
+                        lookup(identifier)
+                    elapsed = (time.perf_counter() - started) * 1000 / len(identifiers)
+                    self.stdout.write(f"{label:<12} {elapsed:>9.2f}  {self._plan(lookup, identifiers[0])}")
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, count):
+        table = get_user_model()._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (password, is_superuser, username, first_name, last_name, email,
+                                     is_staff, is_active, date_joined, role, phone)
+                SELECT '!', false, 'bench-user-' || n, '', '', 'bench' || n || '@example.com',
+                       false, true, now(), 'customer', '07' || lpad(n::text, 8, '0')
+                FROM generate_series(1, %s) AS n
+                """,
+                [count],
+            )
+            cursor.execute(f"ANALYZE {table}")
+
+    def _plan(self, lookup, identifier):
+        with CaptureQueriesContext(connection) as queries:
+            lookup(identifier)
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {queries[-1]['sql']}")
+            nodes = [row[0].strip().lstrip("-> ").split("  (")[0] for row in cursor.fetchall()]
+        return " / ".join(node for node in nodes if "Scan" in node)
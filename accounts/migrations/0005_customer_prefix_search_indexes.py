@@ -0,0 +1,40 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:57
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_login_identifier_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_email_prefix_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_email_ci_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_username_ci_idx',
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('email'), name='varchar_pattern_ops'), name='user_email_ci_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('username'), name='varchar_pattern_ops'), name='user_username_ci_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['phone'], name='user_phone_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import OpClass
 from django.db import models
+from django.db.models.functions import Lower
 
 class User(AbstractUser):
     ROLE_CHOICES = (
@@ -12,5 +14,16 @@ class User(AbstractUser):
     phone = models.CharField(max_length=20, unique=True, null=True, blank=True)
     birth_date = models.DateField(null=True, blank=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=["role", "-date_joined", "-id"], name="user_role_joined_idx"),
+            models.Index(fields=["role", "username", "id"], name="user_role_username_idx"),
+            # Case-insensitive login lookups (accounts.identifiers) and the
+            # dashboard's prefix search; pattern_ops serve both = and LIKE 'x%'.
+            models.Index(OpClass(Lower("email"), name="varchar_pattern_ops"), name="user_email_ci_idx"),
+            models.Index(OpClass(Lower("username"), name="varchar_pattern_ops"), name="user_username_ci_idx"),
+            models.Index(fields=["phone"], name="user_phone_prefix_idx", opclasses=["varchar_pattern_ops"]),
+        ]
+
     def __str__(self):
         return self.username
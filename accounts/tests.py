@@ -1,3 +1,38 @@
+from django.contrib.auth import authenticate
 from django.test import TestCase
 
-# Create your tests here.
+from .identifiers import resolve_identifier
+from .models import User
+
+
+class IdentifierLoginTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            "0912345678", email="Buyer@Example.com", phone="0912345678", password="secret-pass-1"
+        )
+
+    def test_resolves_email_phone_and_username_in_one_query(self):
+        for identifier in ("buyer@example.COM", "0912 345 678", "0912345678"):
+            with self.assertNumQueries(1):
+                self.assertEqual(resolve_identifier(identifier), self.user)
+        self.assertIsNone(resolve_identifier("nobody@example.com"))
+
+    def test_username_match_wins_over_other_accounts_emails(self):
+        for index in range(4):
+            User.objects.create_user(f"shared-{index}", email="buyer@example.com", password="secret-pass-2")
+        other = User.objects.create_user("buyer@example.com", password="secret-pass-3")
+
+        self.assertEqual(resolve_identifier("Buyer@example.com"), other)
+
+    def test_authenticate_by_identifier(self):
+        self.assertEqual(authenticate(identifier="BUYER@example.com", password="secret-pass-1"), self.user)
+        self.assertIsNone(authenticate(identifier="BUYER@example.com", password="wrong"))
+        self.assertEqual(authenticate(username="0912345678", password="secret-pass-1"), self.user)
+
+    def test_login_view_accepts_email(self):
+        response = self.client.post(
+            "/account/login/", {"identifier": "buyer@example.com", "password": "secret-pass-1"}
+        )
+
+        self.assertRedirects(response, "/", fetch_redirect_response=False)
+        self.assertEqual(int(self.client.session["_auth_user_id"]), self.user.pk)
@@ -1,5 +1,4 @@
-from django.contrib.auth import authenticate, login, logout, get_user_model
-from django.db.models import Q
+from django.contrib.auth import authenticate, login, logout
 from django.shortcuts import render, redirect
 
 from .forms import RegisterForm
@@ -25,20 +24,7 @@ def login_view(request):
         user = None
 
         if identifier:
-            lookup_phone = identifier
-            if "@" not in identifier:
-                normalized = "".join(ch for ch in identifier if ch.isdigit() or ch == "+")
-                if normalized:
-                    lookup_phone = normalized
-            user_model = get_user_model()
-            candidate = user_model.objects.filter(
-                Q(email__iexact=identifier) | Q(phone=lookup_phone) | Q(username__iexact=identifier)
-            ).first()
-            if candidate:
-                user = authenticate(request, username=candidate.username, password=password)
-
-        if user is None and identifier:
-            user = authenticate(request, username=identifier, password=password)
+            user = authenticate(request, identifier=identifier, password=password)
 
         if user is not None:
             login(request, user)
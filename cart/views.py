@@ -10,10 +10,9 @@ def add_to_cart(request, product_id):
 
 @login_required
 def cart_detail(request):
-    cart = Cart(request)
-    products = cart.get_products()
+    snapshot = Cart(request).snapshot()
 
     return render(request, 'cart/cart_detail.html', {
-        'products': products,
-        'cart': cart
+        'products': [line.product for line in snapshot],
+        'cart': snapshot
     })
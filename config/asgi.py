@@ -3,6 +3,10 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Run the site under ASGI (e.g. ``uvicorn config.asgi:application``) so the
+dashboard order stream can hold its server-sent-events connections open
+without tying up a worker thread per staff tab.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
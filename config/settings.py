@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'accounts',
     'products',
     'orders',
@@ -131,6 +132,12 @@ STATIC_URL = '/static/'
 
 AUTH_USER_MODEL = 'accounts.User'
 
+# Storefront and dashboard logins accept an email, phone or username.
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.IdentifierBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 LOGIN_URL = '/account/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
@@ -142,13 +149,42 @@ VIETQR_ACCOUNT_NAME = "Cong ty TNHH TechOne"
 VIETQR_ADD_INFO = "Thanh toan don hang TechOne"
 VIETQR_TEMPLATE = "compact2"
 
-# Separate session cookie for dashboard/admin area.
+# How long checkout holds cart stock before the expiry sweep releases it.
+STOCK_HOLD_MINUTES = 15
+
+# Separate session cookie for dashboard/admin area, with a shorter lifetime.
 ADMIN_SESSION_COOKIE_NAME = 'admin_sessionid'
+ADMIN_SESSION_COOKIE_AGE = 60 * 60 * 8
+
+# Cache-first sessions with database write-through (see core.sessions).
+SESSION_ENGINE = 'core.sessions'
 
 import os
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Shared cache for storefront fragments (category nav, ...). Set REDIS_URL in
+# production so every worker sees the same invalidations; the local-memory
+# fallback is only coherent within a single process.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'vnt-phonestore',
+        }
+    }
+
+# Pub/sub used to push new orders to the dashboard stream (see orders.events).
+ORDER_EVENTS_BACKEND = 'orders.events.RedisBroker' if REDIS_URL else 'orders.events.LocalBroker'
+
 USE_L10N = True
 LANGUAGE_CODE = 'vi'
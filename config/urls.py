@@ -9,6 +9,7 @@ from core import views
 from core.views import home
 from core.views import home, product_detail
 from core.views import home, product_detail, category_detail, search
+from products.views import serve_media
 
 
 
@@ -27,14 +28,18 @@ urlpatterns = [
     path('checkout/', views.checkout_info, name='checkout_info'),
     path('checkout/payment/', views.checkout_payment, name='checkout_payment'),
     path('checkout/success/<int:order_id>/', views.checkout_success, name='checkout_success'),
+    path('checkout/provinces/', views.province_list, name='province_list'),
+    path('checkout/provinces/<str:code>/wards/', views.ward_list, name='ward_list'),
     path('cart/', include('cart.urls')),
     path('cart/', views.cart_detail, name='cart'),
     path('cart/add/<int:product_id>/', views.cart_add, name='cart_add'),
     path('cart/decrease/<int:product_id>/', views.cart_decrease, name='cart_decrease'),
     path('cart/remove/<int:product_id>/', views.cart_remove, name='cart_remove'),
+    path('cart/api/batch/', views.cart_api_batch, name='cart_api_batch'),
+    path('cart/api/<str:action>/<int:product_id>/', views.cart_api_line, name='cart_api_line'),
     path("dashboard/", include("dashboard.urls")),
     path('<slug:slug>/', category_detail, name='category_detail'),
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(settings.MEDIA_URL, view=serve_media, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,65 @@
+import time
+
+from django.core.cache import cache
+
+CATEGORY_NAV_VERSION_KEY = "catalog:category_nav:version"
+CATEGORY_NAV_TIMEOUT = 60 * 60 * 24
+
+# Bumped whenever a product, brand or category changes. Storefront page
+# fragments and the lookups behind them are keyed on it.
+CATALOG_VERSION_KEY = "catalog:version"
+CATALOG_TIMEOUT = 60 * 60 * 24
+
+
+def get_version(key):
+    """
+    Return the current generation number stored under ``key``.
+
+    Cached values embed this number in their own keys, so bumping it
+    invalidates all of them at once. Seeding from the clock keeps a
+    version that was evicted from the cache from ever coming back around.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, None)
+        return version
+
+
+def get_category_nav():
+    from products.models import Category
+
+    key = f"catalog:category_nav:{get_version(CATEGORY_NAV_VERSION_KEY)}"
+    categories = cache.get(key)
+    if categories is None:
+        categories = [
+            {"name": name, "slug": slug}
+            for name, slug in Category.objects.order_by("id").values_list("name", "slug")
+        ]
+        cache.set(key, categories, CATEGORY_NAV_TIMEOUT)
+    return categories
+
+
+def get_catalog_object(name, loader):
+    """
+    Return ``loader()`` (a model instance or None), memoised until the next
+    catalog change, so a warm storefront page needs no catalog query.
+    Misses are not cached: the category URL is a catch-all, and probes for
+    random slugs would otherwise fill the cache with None entries.
+    """
+    key = f"catalog:{get_version(CATALOG_VERSION_KEY)}:{name}"
+    value = cache.get(key)
+    if value is None:
+        value = loader()
+        if value is not None:
+            cache.set(key, value, CATALOG_TIMEOUT)
+    return value
@@ -1,7 +1,126 @@
-from products.models import Product
+from decimal import Decimal
+from typing import NamedTuple
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from products.models import PRODUCT_CARD_FIELDS, Product
 
 from cart.models import CartItem
 
+CART_COUNT_TIMEOUT = 60 * 60 * 24
+
+
+def _count_key(user_id):
+    return f"cart:count:{user_id}"
+
+
+def _upsert_items(user_id, quantities):
+    """
+    Add {product_id: quantity} onto the user's cart rows in one statement.
+    ON CONFLICT increments the stored quantity inside the database, so two
+    concurrent adds both land; ids of products that no longer exist are
+    dropped by the join. Returns the number of rows inserted or updated.
+    """
+    quantities = {int(product_id): quantity for product_id, quantity in quantities.items() if quantity > 0}
+    if not quantities:
+        return 0
+    table = CartItem._meta.db_table
+    values = ", ".join(["(%s, %s)"] * len(quantities))
+    params = [value for item in quantities.items() for value in item]
+    now = timezone.now()
+    sql = (
+        f'INSERT INTO {table} ("user_id", "product_id", "quantity", "created_at", "updated_at") '
+        f'SELECT %s, p."id", v."quantity", %s, %s '
+        f'FROM (VALUES {values}) AS v("product_id", "quantity") '
+        f'JOIN {Product._meta.db_table} p ON p."id" = v."product_id" '
+        f'ON CONFLICT ("user_id", "product_id") DO UPDATE SET '
+        f'"quantity" = {table}."quantity" + EXCLUDED."quantity", '
+        f'"updated_at" = EXCLUDED."updated_at"'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [user_id, now, now, *params])
+        return cursor.rowcount
+
+
+def merge_session_cart(request, user):
+    """
+    Move a guest cart from the session onto the user's cart rows with one
+    upsert. Runs once, from the user_logged_in signal.
+    """
+    cart = request.session.get("cart")
+    if not isinstance(cart, dict) or not cart:
+        return
+    quantities = {}
+    for product_id, payload in cart.items():
+        try:
+            quantities[int(product_id)] = int(payload.get("quantity", 0))
+        except (AttributeError, TypeError, ValueError):
+            continue
+    _upsert_items(user.pk, quantities)
+    del request.session["cart"]
+    cache.delete(_count_key(user.pk))
+
+
+def get_cart_count(request):
+    """
+    Badge count for the header. Logged-in users read a cached per-user
+    counter that Cart mutations keep current, so rendering a page never
+    loads cart rows or joins them with products.
+    """
+    user = getattr(request, "user", None)
+    if not (user and user.is_authenticated):
+        cart = request.session.get("cart")
+        if not isinstance(cart, dict):
+            return 0
+        return sum(int(item.get("quantity", 0)) for item in cart.values())
+
+    key = _count_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = CartItem.objects.filter(user=user).aggregate(total=Sum("quantity"))["total"] or 0
+        cache.set(key, count, CART_COUNT_TIMEOUT)
+    return count
+
+
+class CartLine(NamedTuple):
+    product: Product
+    quantity: int
+    total_price: Decimal
+
+
+class CartSnapshot:
+    """
+    Immutable view of a cart taken with a single query. Totals are computed
+    once, so checkout and templates can read it as often as they like.
+    """
+
+    __slots__ = ("lines", "subtotal", "total_quantity")
+
+    def __init__(self, lines):
+        lines = tuple(lines)
+        object.__setattr__(self, "lines", lines)
+        object.__setattr__(self, "subtotal", sum((line.total_price for line in lines), Decimal("0")))
+        object.__setattr__(self, "total_quantity", sum(line.quantity for line in lines))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CartSnapshot is immutable")
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __bool__(self):
+        return bool(self.lines)
+
+    @property
+    def product_ids(self):
+        return [line.product.id for line in self.lines]
+
 
 class Cart:
     def __init__(self, request):
@@ -9,16 +128,15 @@ class Cart:
         self.session = request.session
         self.user = getattr(request, "user", None)
         self.use_db = bool(self.user and self.user.is_authenticated)
-        self._items_cache = None
+        self._snapshot = None
 
         if self.use_db:
             self.cart = None
-            self._merge_session_cart()
         else:
+            # Only read here: the session is written (and created) by save()
+            # once the cart actually holds something.
             cart = self.session.get('cart')
-            if not cart:
-                cart = self.session['cart'] = {}
-            self.cart = cart
+            self.cart = cart if isinstance(cart, dict) else {}
 
     def add(self, product, quantity=1):
         product_id = self._get_product_id(product)
@@ -37,15 +155,15 @@ class Cart:
         product_id = self._get_product_id(product)
 
         if self.use_db:
-            item = CartItem.objects.filter(user=self.user, product_id=product_id).first()
-            if not item:
-                return
-            item.quantity -= 1
-            if item.quantity <= 0:
-                item.delete()
-            else:
-                item.save()
-            self._items_cache = None
+            items = CartItem.objects.filter(user=self.user, product_id=product_id)
+            changed = items.filter(quantity__gt=1).update(
+                quantity=F("quantity") - 1, updated_at=timezone.now()
+            )
+            if not changed:
+                changed, _ = items.filter(quantity__lte=1).delete()
+            if changed:
+                self._snapshot = None
+                self._adjust_count(-1)
             return
 
         if product_id in self.cart:
@@ -61,7 +179,8 @@ class Cart:
 
         if self.use_db:
             CartItem.objects.filter(user=self.user, product_id=product_id).delete()
-            self._items_cache = None
+            self._snapshot = None
+            cache.delete(_count_key(self.user.pk))
             return
 
         if product_id in self.cart:
@@ -72,98 +191,78 @@ class Cart:
     def clear(self):
         if self.use_db:
             CartItem.objects.filter(user=self.user).delete()
-            self._items_cache = None
+            self._snapshot = None
+            cache.set(_count_key(self.user.pk), 0, CART_COUNT_TIMEOUT)
             return
 
-        self.session.pop("cart", None)
         self.cart = {}
         self.save()
 
     def save(self):
-        if not self.use_db:
-            self.session.modified = True
-
-    def __iter__(self):
+        self._snapshot = None
         if self.use_db:
-            for item in self._get_db_items():
-                yield {
-                    "product": item.product,
-                    "quantity": item.quantity,
-                    "total_price": item.product.price * item.quantity,
-                }
             return
+        if self.cart:
+            self.session['cart'] = self.cart
+            self.session.modified = True
+        elif 'cart' in self.session:
+            del self.session['cart']
 
-        product_ids = self.cart.keys()
-        products = Product.objects.filter(id__in=product_ids)
+    def snapshot(self):
+        if self._snapshot is None:
+            self._snapshot = CartSnapshot(self._load_lines())
+        return self._snapshot
 
-        for product in products:
-            item = self.cart[str(product.id)]
-            item['product'] = product
-            item['total_price'] = product.price * item['quantity']
-            yield item
+    def __iter__(self):
+        return iter(self.snapshot())
 
     def get_total_price(self):
-        if self.use_db:
-            return sum(item.product.price * item.quantity for item in self._get_db_items())
-
-        return sum(
-            item['product'].price * item['quantity']
-            for item in self
-        )
+        return self.snapshot().subtotal
 
     def get_total_quantity(self):
         if self.use_db:
-            return sum(item.quantity for item in self._get_db_items())
+            return self.snapshot().total_quantity
 
         return sum(item['quantity'] for item in self.cart.values())
 
     def get_products(self):
-        if self.use_db:
-            product_ids = [item.product_id for item in self._get_db_items()]
-            return Product.objects.filter(id__in=product_ids)
-        product_ids = self.cart.keys()
-        return Product.objects.filter(id__in=product_ids)
+        return [line.product for line in self.snapshot()]
 
     def _get_product_id(self, product):
         if isinstance(product, Product):
             return str(product.id)
         return str(product)
 
-    def _get_db_items(self):
-        if self._items_cache is None:
-            self._items_cache = list(
-                CartItem.objects.filter(user=self.user).select_related("product")
+    def _load_lines(self):
+        if self.use_db:
+            items = (
+                CartItem.objects.filter(user=self.user)
+                .select_related("product")
+                .only("quantity", *(f"product__{name}" for name in PRODUCT_CARD_FIELDS))
+                .order_by("id")
             )
-        return self._items_cache
+            return [
+                CartLine(item.product, item.quantity, item.product.price * item.quantity)
+                for item in items
+            ]
+
+        lines = []
+        for product in Product.objects.cards().filter(id__in=self.cart.keys()).order_by("id"):
+            quantity = self.cart[str(product.id)]['quantity']
+            lines.append(CartLine(product, quantity, product.price * quantity))
+        return lines
 
     def _db_add(self, product_id, quantity):
         if quantity <= 0:
             return
-        item, _ = CartItem.objects.get_or_create(
-            user=self.user,
-            product_id=product_id,
-            defaults={"quantity": 0},
-        )
-        item.quantity += quantity
-        if item.quantity <= 0:
-            item.delete()
-        else:
-            item.save()
-        self._items_cache = None
+        if _upsert_items(self.user.pk, {product_id: quantity}):
+            self._snapshot = None
+            self._adjust_count(quantity)
 
-    def _merge_session_cart(self):
-        cart = self.session.get("cart")
-        if not isinstance(cart, dict) or not cart:
-            return
-        for product_id, payload in cart.items():
-            try:
-                quantity = int(payload.get("quantity", 0))
-            except (TypeError, ValueError):
-                continue
-            if quantity > 0:
-                self._db_add(product_id, quantity)
+    def _adjust_count(self, delta):
+        # Only adjust a counter that is already cached; a missing one is
+        # recomputed from cart rows on the next read.
         try:
-            del self.session["cart"]
-        except KeyError:
+            cache.incr(_count_key(self.user.pk), delta)
+        except ValueError:
             pass
-        self.session.modified = True
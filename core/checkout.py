@@ -0,0 +1,148 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from orders.models import Order, OrderItem, StockHold
+from products.models import Product
+
+
+class OutOfStock(Exception):
+    def __init__(self, product):
+        self.product = product
+        super().__init__(f"Insufficient stock for product {product.pk}")
+
+
+def _hold_ttl():
+    return timedelta(minutes=getattr(settings, "STOCK_HOLD_MINUTES", 15))
+
+
+def _take_holds(user):
+    """
+    Lock and delete the user's holds, returning {product_id: quantity}.
+    Whoever deletes a hold row owns giving its units back, so the lock keeps
+    the expiry sweep and checkout from both releasing the same hold.
+    """
+    holds = list(StockHold.objects.select_for_update().filter(user=user).order_by("product_id"))
+    if holds:
+        StockHold.objects.filter(pk__in=[hold.pk for hold in holds]).delete()
+    return {hold.product_id: hold.quantity for hold in holds}
+
+
+def _release(quantities):
+    for product_id in sorted(quantities):
+        Product.objects.filter(pk=product_id).update(reserved=F("reserved") - quantities[product_id])
+
+
+def release_holds(user):
+    """Delete the user's holds and give their units back. Must run inside a transaction."""
+    _release(_take_holds(user))
+
+
+def hold_stock(user, snapshot):
+    """
+    Reserve every cart line for STOCK_HOLD_MINUTES. If the user already holds
+    exactly these lines only the expiry is pushed back (one UPDATE); otherwise
+    the old holds are swapped for new ones. Raises OutOfStock when a line
+    cannot be held; the previous holds are then left as they were.
+    """
+    wanted = {line.product.pk: line.quantity for line in snapshot}
+    expires_at = timezone.now() + _hold_ttl()
+
+    with transaction.atomic():
+        held = dict(
+            StockHold.objects.select_for_update()
+            .filter(user=user)
+            .values_list("product_id", "quantity")
+        )
+        if held == wanted:
+            StockHold.objects.filter(user=user).update(expires_at=expires_at)
+            return
+
+        StockHold.objects.filter(user=user).delete()
+        for line in sorted(snapshot, key=lambda line: line.product.pk):
+            previous = held.pop(line.product.pk, 0)
+            delta = line.quantity - previous
+            updated = Product.objects.filter(
+                pk=line.product.pk, stock__gte=F("reserved") + delta
+            ).update(reserved=F("reserved") + delta)
+            if not updated:
+                raise OutOfStock(line.product)
+        _release(held)
+        StockHold.objects.bulk_create([
+            StockHold(user=user, product=line.product, quantity=line.quantity, expires_at=expires_at)
+            for line in snapshot
+        ])
+
+
+def release_expired_holds(batch_size=500):
+    """
+    Release one batch of expired holds through the expires_at index.
+    Rows locked by an in-flight checkout are skipped and picked up later.
+    Returns the number of holds released.
+    """
+    with transaction.atomic():
+        holds = list(
+            StockHold.objects.select_for_update(skip_locked=True)
+            .filter(expires_at__lte=timezone.now())
+            .order_by("expires_at")
+            .values_list("pk", "product_id", "quantity")[:batch_size]
+        )
+        if not holds:
+            return 0
+        quantities = defaultdict(int)
+        for _, product_id, quantity in holds:
+            quantities[product_id] += quantity
+        StockHold.objects.filter(pk__in=[pk for pk, _, _ in holds]).delete()
+        _release(quantities)
+    return len(holds)
+
+
+def reserve_stock(lines, held=None):
+    """
+    Decrement stock for every line with a conditional UPDATE, so two
+    concurrent checkouts can never both take the last unit. Units the
+    buyer already holds are converted into the sale; everything else must
+    come out of unreserved stock. Lines are processed in product id order
+    to keep row locks acquired in a consistent order across transactions
+    (no deadlocks).
+    Must run inside a transaction; raises OutOfStock on the first short line.
+    """
+    held = dict(held or {})
+    for line in sorted(lines, key=lambda line: line.product.pk):
+        own = held.pop(line.product.pk, 0)
+        updated = Product.objects.filter(
+            pk=line.product.pk, stock__gte=F("reserved") - own + line.quantity
+        ).update(stock=F("stock") - line.quantity, reserved=F("reserved") - own)
+        if not updated:
+            raise OutOfStock(line.product)
+    _release(held)
+
+
+def place_order(snapshot, **order_fields):
+    """
+    Create an order for a CartSnapshot: the buyer's holds are converted
+    into the sale, then one stock UPDATE per line, one order INSERT (plus
+    the status counter upsert from orders.signals) and one bulk INSERT for
+    the items. Everything is rolled back if any line is short.
+    """
+    with transaction.atomic():
+        user = order_fields.get("user")
+        held = _take_holds(user) if user is not None else {}
+        reserve_stock(snapshot.lines, held)
+        order = Order.objects.create(**order_fields)
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=line.product,
+                product_name=line.product.name,
+                price=line.product.price,
+                quantity=line.quantity,
+                total=line.total_price,
+            )
+            for line in snapshot
+        ])
+    return order
@@ -1,12 +1,21 @@
-from products.models import Category
-from .cart import Cart
+from django.utils.functional import SimpleLazyObject
+
+from .caching import CATALOG_VERSION_KEY, CATEGORY_NAV_VERSION_KEY, get_category_nav, get_version
+from .cart import Cart, get_cart_count
 
 def categories_processor(request):
+    # Both values are lazy: the nav fragment in base.html is cached on the
+    # version, so a warm page never evaluates the category list at all.
     return {
-        'categories': Category.objects.all()
+        'categories': SimpleLazyObject(get_category_nav),
+        'category_nav_version': SimpleLazyObject(lambda: get_version(CATEGORY_NAV_VERSION_KEY)),
+        'catalog_version': SimpleLazyObject(lambda: get_version(CATALOG_VERSION_KEY)),
     }
 
 def cart(request):
+    # Nothing is evaluated unless a template actually reads these; the
+    # header badge only needs the cached count, not a full Cart.
     return {
-        'cart': Cart(request)
-    }
\ No newline at end of file
+        'cart': SimpleLazyObject(lambda: Cart(request)),
+        'cart_count': SimpleLazyObject(lambda: get_cart_count(request)),
+    }
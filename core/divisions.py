@@ -0,0 +1,121 @@
+"""
+Vietnamese provinces and wards for the checkout address picker.
+
+The data lives in the Province/Ward tables, loaded from a local JSON file
+(the provinces.open-api.vn export format) by ``manage.py load_divisions``;
+the current list ships in core/data/divisions.json.
+The endpoints serve pre-serialised JSON from the cache with a content-hash
+ETag, so a browser revalidating its copy gets a 304 without a query.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .caching import bump_version, get_version
+from .models import Province, Ward
+
+DIVISIONS_VERSION_KEY = "divisions:version"
+DIVISIONS_TIMEOUT = 60 * 60 * 24 * 7
+
+# Keys the export uses for the ward list, on a province or (older
+# three-level exports) on each of its districts.
+_WARD_KEYS = ("wards", "communes")
+
+
+def _serialise(data):
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+    return body, hashlib.sha256(body).hexdigest()[:32]
+
+
+def _cached(name, build):
+    key = f"divisions:{get_version(DIVISIONS_VERSION_KEY)}:{name}"
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, DIVISIONS_TIMEOUT)
+    return value
+
+
+def _provinces():
+    def build():
+        provinces = [
+            {"code": code, "name": name}
+            for code, name in Province.objects.order_by("name").values_list("code", "name")
+        ]
+        body, etag = _serialise(provinces)
+        return {"body": body, "etag": etag, "codes": frozenset(item["code"] for item in provinces)}
+
+    return _cached("provinces", build)
+
+
+def province_payload():
+    """
+    (JSON body, ETag) of [{"code", "name"}, ...] for every province, or
+    (None, None) while none are loaded.
+    """
+    provinces = _provinces()
+    if not provinces["codes"]:
+        return None, None
+    return provinces["body"], provinces["etag"]
+
+
+def ward_payload(province_code):
+    """
+    (JSON body, ETag) of one province's wards, or (None, None) if it does
+    not exist. Unknown codes are rejected against the cached province list,
+    so probing random codes never adds cache entries.
+    """
+    if province_code not in _provinces()["codes"]:
+        return None, None
+
+    def build():
+        wards = Ward.objects.filter(province_id=province_code).order_by("name").values_list("code", "name")
+        return _serialise([{"code": code, "name": name} for code, name in wards])
+
+    return _cached(f"wards:{province_code}", build)
+
+
+def _ward_items(province):
+    for key in _WARD_KEYS:
+        if isinstance(province.get(key), list):
+            return province[key]
+    wards = []
+    for district in province.get("districts") or []:
+        for key in _WARD_KEYS:
+            if isinstance(district.get(key), list):
+                wards.extend(district[key])
+                break
+    return wards
+
+
+def parse_divisions(data):
+    """Turn an export (list of provinces) into unsaved Province and Ward rows."""
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON list of provinces.")
+    provinces, wards = [], []
+    for item in data:
+        code, name = str(item.get("code", "")).strip(), str(item.get("name", "")).strip()
+        if not code or not name:
+            continue
+        provinces.append(Province(code=code, name=name))
+        for ward in _ward_items(item):
+            ward_code, ward_name = str(ward.get("code", "")).strip(), str(ward.get("name", "")).strip()
+            if ward_code and ward_name:
+                wards.append(Ward(code=ward_code, province_id=code, name=ward_name))
+    if not provinces:
+        raise ValueError("No provinces found.")
+    return provinces, wards
+
+
+@transaction.atomic
+def load_divisions(data):
+    """Replace the stored divisions with ``data``. Returns (provinces, wards)."""
+    provinces, wards = parse_divisions(data)
+    Ward.objects.all().delete()
+    Province.objects.all().delete()
+    Province.objects.bulk_create(provinces, batch_size=1000)
+    Ward.objects.bulk_create(wards, batch_size=1000)
+    transaction.on_commit(lambda: bump_version(DIVISIONS_VERSION_KEY))
+    return len(provinces), len(wards)
@@ -0,0 +1,70 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from products.models import Product
+
+ENGINES = ("django.contrib.sessions.backends.db", "core.sessions")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare django_session reads/writes per request for the plain database "
+        "session engine and core.sessions, for a customer and a staff member."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50, help="Requests per scenario.")
+
+    def handle(self, *args, **options):
+        customer = User.objects.create_user("bench-session-customer", password="bench-pass-1")
+        staff = User.objects.create_user("bench-session-staff", password="bench-pass-2", is_staff=True)
+        product = Product.objects.filter(is_active=True).first()
+        customer_urls = ["/", "/cart/"] + ([f"/product/{product.slug}/"] if product else [])
+        staff_urls = ["/dashboard/", "/dashboard/orders/"]
+
+        self.stdout.write(f"{'engine':<40} {'area':<10} {'reads/req':>10} {'writes/req':>11} {'ms/req':>8}")
+        try:
+            for engine in ENGINES:
+                with override_settings(SESSION_ENGINE=engine, ALLOWED_HOSTS=["testserver"]):
+                    for area, user, urls, cookie in (
+                        ("customer", customer, customer_urls, settings.SESSION_COOKIE_NAME),
+                        ("dashboard", staff, staff_urls, settings.ADMIN_SESSION_COOKIE_NAME),
+                    ):
+                        reads, writes, elapsed = self._run(user, urls, cookie, options["requests"])
+                        total = options["requests"]
+                        self.stdout.write(
+                            f"{engine:<40} {area:<10} {reads / total:>10.2f} {writes / total:>11.2f} "
+                            f"{elapsed * 1000 / total:>8.1f}"
+                        )
+        finally:
+            customer.delete()
+            staff.delete()
+
+    def _run(self, user, urls, cookie, count):
+        client = Client()
+        client.force_login(user)
+        client.cookies[cookie] = client.cookies[settings.SESSION_COOKIE_NAME].value
+        client.get(urls[0])
+
+        reads = writes = 0
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for index in range(count):
+                client.get(urls[index % len(urls)])
+        elapsed = time.perf_counter() - started
+        for query in queries:
+            sql = query["sql"]
+            if "django_session" not in sql:
+                continue
+            if sql.startswith("SELECT"):
+                reads += 1
+            else:
+                writes += 1
+        client.logout()
+        return reads, writes, elapsed
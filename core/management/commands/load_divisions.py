@@ -0,0 +1,29 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.divisions import load_divisions
+
+
+class Command(BaseCommand):
+    help = (
+        "Replace the provinces and wards used by the checkout address picker with the "
+        "contents of a local JSON file in the provinces.open-api.vn export format."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default=getattr(settings, "DIVISIONS_FILE", settings.BASE_DIR / "core" / "data" / "divisions.json"),
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], encoding="utf-8") as handle:
+                data = json.load(handle)
+            provinces, wards = load_divisions(data)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Could not load {options['path']}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"Loaded {provinces} provinces and {wards} wards."))
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.sessions import count_expired_sessions, purge_expired_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions in small batches with a pause between them, instead of "
+        "clearsessions' single DELETE. With --forever it keeps running as a worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--pause", type=float, default=0.2, help="Seconds to sleep between batches.")
+        parser.add_argument("--max-batches", type=int, default=0, help="Stop a pass after this many batches.")
+        parser.add_argument("--forever", action="store_true", help="Repeat passes until interrupted.")
+        parser.add_argument("--interval", type=float, default=300, help="Seconds between passes with --forever.")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                purged = self._pass(options)
+                remaining = count_expired_sessions()
+                self.stdout.write(f"Purged {purged} expired sessions; {remaining} expired remaining.")
+                if not options["forever"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+
+    def _pass(self, options):
+        purged = batches = 0
+        while True:
+            deleted = purge_expired_sessions(options["batch_size"])
+            purged += deleted
+            batches += 1
+            if deleted < options["batch_size"]:
+                return purged
+            if options["max_batches"] and batches >= options["max_batches"]:
+                return purged
+            time.sleep(options["pause"])
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.checkout import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Release checkout stock holds whose TTL has passed. Safe to run from cron every minute."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            released = release_expired_holds(options["batch_size"])
+            if not released:
+                break
+            total += released
+        self.stdout.write(self.style.SUCCESS(f"Released {total} expired holds."))
@@ -23,11 +23,18 @@ class SplitSessionMiddleware(SessionMiddleware):
                 return admin_cookie
         return settings.SESSION_COOKIE_NAME
 
+    def _get_cookie_age(self, cookie_name):
+        if cookie_name == getattr(settings, "ADMIN_SESSION_COOKIE_NAME", "admin_sessionid"):
+            return getattr(settings, "ADMIN_SESSION_COOKIE_AGE", settings.SESSION_COOKIE_AGE)
+        return settings.SESSION_COOKIE_AGE
+
     def process_request(self, request):
         cookie_name = self._get_cookie_name(request)
         request._session_cookie_name = cookie_name
         session_key = request.COOKIES.get(cookie_name)
         request.session = self.SessionStore(session_key)
+        # Honoured by core.sessions; other engines ignore it.
+        request.session.cookie_age = self._get_cookie_age(cookie_name)
 
     def process_response(self, request, response):
         try:
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Province',
+            fields=[
+                ('code', models.CharField(max_length=16, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Ward',
+            fields=[
+                ('code', models.CharField(max_length=16, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('province', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wards', to='core.province')),
+            ],
+        ),
+    ]
@@ -1,3 +1,20 @@
 from django.db import models
 
-# Create your models here.
+
+# Administrative divisions for the checkout address picker, loaded from a
+# local file by the load_divisions command; see core.divisions.
+class Province(models.Model):
+    code = models.CharField(max_length=16, primary_key=True)
+    name = models.CharField(max_length=100)
+
+    def __str__(self):
+        return self.name
+
+
+class Ward(models.Model):
+    code = models.CharField(max_length=16, primary_key=True)
+    province = models.ForeignKey(Province, on_delete=models.CASCADE, related_name="wards")
+    name = models.CharField(max_length=100)
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,77 @@
+"""
+Session engine for SplitSessionMiddleware (SESSION_ENGINE = "core.sessions").
+
+Built on Django's cached_db backend: sessions are read from the shared
+cache and only fall back to django_session on a miss. On top of that:
+
+- save() is skipped when the session data is the same as what was loaded,
+  so a request that merely re-assigns a value, or sets ``modified`` without
+  changing anything, costs neither a cache nor a database write. Real
+  changes are still written through to the database straight away, so a
+  cache flush never loses a login or a guest cart.
+- The cookie age comes from the namespace the middleware assigns
+  (customer vs. dashboard), not only from SESSION_COOKIE_AGE.
+"""
+import copy
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.db import transaction
+from django.utils import timezone
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = "core.sessions."
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # Set by SplitSessionMiddleware per cookie namespace.
+        self.cookie_age = None
+        self._stored = None
+
+    def get_session_cookie_age(self):
+        return self.cookie_age or settings.SESSION_COOKIE_AGE
+
+    def load(self):
+        data = super().load()
+        self._stored = copy.deepcopy(data)
+        return data
+
+    def save(self, must_create=False):
+        if not must_create and self._unchanged():
+            return
+        super().save(must_create)
+        self._stored = copy.deepcopy(self._session)
+
+    def _unchanged(self):
+        if settings.SESSION_SAVE_EVERY_REQUEST:
+            # Every save is meant to push the expiry forward.
+            return False
+        return (
+            self.session_key is not None
+            and self._stored is not None
+            and getattr(self, "_session_cache", None) == self._stored
+        )
+
+
+def purge_expired_sessions(batch_size=1000):
+    """
+    Delete one batch of expired rows from django_session through the
+    expire_date index and return how many were deleted. Rows locked by a
+    request that is saving them are skipped, so a batch never waits.
+    """
+    Session = SessionStore.get_model_class()
+    with transaction.atomic():
+        keys = list(
+            Session.objects.select_for_update(skip_locked=True)
+            .filter(expire_date__lt=timezone.now())
+            .values_list("session_key", flat=True)[:batch_size]
+        )
+        if keys:
+            Session.objects.filter(session_key__in=keys).delete()
+    return len(keys)
+
+
+def count_expired_sessions():
+    Session = SessionStore.get_model_class()
+    return Session.objects.filter(expire_date__lt=timezone.now()).count()
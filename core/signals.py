@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from products.models import Brand, Category, Product
+
+from .caching import CATALOG_VERSION_KEY, CATEGORY_NAV_VERSION_KEY, bump_version
+from .cart import merge_session_cart
+from .checkout import release_holds
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_nav(sender, **kwargs):
+    # After commit, or a request could re-cache the old nav under the new version.
+    transaction.on_commit(lambda: bump_version(CATEGORY_NAV_VERSION_KEY))
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_pages(sender, **kwargs):
+    # After commit: other post_save handlers (image variants, search vector)
+    # are still writing, and a page cached before they finish would stick.
+    transaction.on_commit(lambda: bump_version(CATALOG_VERSION_KEY))
+
+
+@receiver(pre_delete, sender=get_user_model())
+def release_deleted_user_holds(sender, instance, **kwargs):
+    # The cascade would drop the hold rows without lowering Product.reserved.
+    # Deleting a product needs no such care: its counter goes with it.
+    release_holds(instance)
+
+
+@receiver(user_logged_in)
+def merge_guest_cart(sender, request, user, **kwargs):
+    if request is not None and hasattr(request, "session"):
+        merge_session_cart(request, user)
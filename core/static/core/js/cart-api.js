@@ -0,0 +1,48 @@
+(() => {
+    // Progressive enhancement for cart links: POST to the JSON cart API and
+    // update the page in place. Any failure (logged out, network, server
+    // error) falls back to following the link, which still works without JS.
+    const readCookie = (name) => {
+        const match = document.cookie.match(new RegExp(`(?:^|; )${name}=([^;]*)`));
+        return match ? decodeURIComponent(match[1]) : "";
+    };
+
+    const request = async (url, body) => {
+        const token = readCookie("csrftoken");
+        if (!token) throw new Error("missing csrf token");
+        const response = await fetch(url, {
+            method: "POST",
+            credentials: "same-origin",
+            headers: {
+                "X-CSRFToken": token,
+                "X-Requested-With": "XMLHttpRequest",
+                ...(body ? { "Content-Type": "application/json" } : {}),
+            },
+            body: body ? JSON.stringify(body) : undefined,
+        });
+        if (!response.ok || response.redirected) throw new Error(`cart api ${response.status}`);
+        const payload = await response.json();
+        document.querySelectorAll(".mini-cart__count").forEach((el) => {
+            el.textContent = payload.count;
+        });
+        return payload;
+    };
+
+    window.TechOneCart = {
+        line: (url) => request(url),
+        batch: (url, ops) => request(url, { ops }),
+    };
+
+    document.addEventListener("click", async (event) => {
+        const link = event.target.closest("a[data-cart-add]");
+        if (!link) return;
+        event.preventDefault();
+        try {
+            await request(link.dataset.cartAdd);
+            link.classList.add("is-added");
+            window.setTimeout(() => link.classList.remove("is-added"), 1200);
+        } catch (error) {
+            window.location.href = link.href;
+        }
+    });
+})();
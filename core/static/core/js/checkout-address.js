@@ -8,6 +8,9 @@
         return;
     }
 
+    // Served by the app (core.divisions); the public API is only a fallback
+    // while the divisions table has not been loaded yet.
+    const source = citySelect.dataset.source || "/checkout/provinces/";
     const API_V2 = "https://provinces.open-api.vn/api/v2/";
     const API_V1 = "https://provinces.open-api.vn/api/?depth=3";
 
@@ -94,18 +97,66 @@
         });
 
         provinces.sort((a, b) => a.name.localeCompare(b.name, "vi"));
-        return { provinces, wardMap };
+        return { provinces, loadWards: async (code) => wardMap.get(code) || [] };
     };
 
-    const loadFromApi = async (url) => {
-        const response = await fetch(url, { mode: "cors" });
+    const loadFromApi = async (url, options = { mode: "cors" }) => {
+        const response = await fetch(url, options);
         if (!response.ok) {
             throw new Error("Failed to fetch location data.");
         }
         return response.json();
     };
 
-    const hydrate = ({ provinces, wardMap }) => {
+    const byName = (a, b) => a.name.localeCompare(b.name, "vi");
+
+    const loadRemote = async () => {
+        try {
+            return parseProvinceData(await loadFromApi(`${API_V2}?depth=2`));
+        } catch (error) {
+            return parseProvinceData(await loadFromApi(API_V1));
+        }
+    };
+
+    let remoteData = null;
+    const remoteWards = async (code) => {
+        if (!remoteData) {
+            remoteData = loadRemote().catch((error) => {
+                remoteData = null;
+                throw error;
+            });
+        }
+        return (await remoteData).loadWards(code);
+    };
+
+    const loadLocal = async () => {
+        const provinces = await loadFromApi(source, { credentials: "omit" });
+        if (!Array.isArray(provinces) || provinces.length === 0) {
+            throw new Error("Location data not loaded.");
+        }
+        const wardCache = new Map();
+        const loadWards = (code) => {
+            if (!wardCache.has(code)) {
+                const request = loadFromApi(`${source}${encodeURIComponent(code)}/wards/`, { credentials: "omit" })
+                    .then((wards) => wards.sort(byName))
+                    .catch(async () => {
+                        // Keep checkout usable: the codes come from the
+                        // same export, so the public API can stand in.
+                        wardCache.delete(code);
+                        try {
+                            return await remoteWards(code);
+                        } catch (error) {
+                            return [];
+                        }
+                    });
+                wardCache.set(code, request);
+            }
+            return wardCache.get(code);
+        };
+        return { provinces: provinces.sort(byName), loadWards };
+    };
+
+    const hydrate = ({ provinces, loadWards }) => {
         const selectedCity = citySelect.dataset.selected || "";
         const selectedWard = wardSelect.dataset.selected || "";
 
@@ -123,8 +174,10 @@
             }
         };
 
-        const syncWards = (cityCode, keepSelection = false) => {
-            const wards = wardMap.get(cityCode) || [];
+        const syncWards = async (cityCode, keepSelection = false) => {
+            setOptions(wardSelect, [], "Đang tải danh sách...", true);
+            const wards = cityCode ? await loadWards(cityCode) : [];
+            if (citySelect.value !== cityCode) return;
             setOptions(wardSelect, wards, "Chọn Phường / Xã", wards.length === 0);
             if (keepSelection && selectedWard) {
                 wardSelect.value = selectedWard;
@@ -159,18 +212,16 @@
         setOptions(citySelect, [], "Đang tải danh sách...", true);
         setOptions(wardSelect, [], "Chọn Tỉnh/Thành trước", true);
 
-        try {
-            const data = await loadFromApi(`${API_V2}?depth=2`);
-            hydrate(parseProvinceData(data));
-        } catch (error) {
+        const loaders = [loadLocal, loadRemote];
+        for (const load of loaders) {
             try {
-                const data = await loadFromApi(API_V1);
-                hydrate(parseProvinceData(data));
-            } catch (fallbackError) {
-                setOptions(citySelect, [], "Không tải được danh sách", true);
-                setOptions(wardSelect, [], "Không tải được danh sách", true);
+                hydrate(await load());
+                return;
+            } catch (error) {
             }
         }
+        setOptions(citySelect, [], "Không tải được danh sách", true);
+        setOptions(wardSelect, [], "Không tải được danh sách", true);
     };
 
     init();
@@ -0,0 +1,41 @@
+from django import template
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+CARD_TEMPLATE = "core/includes/product_card.html"
+CARD_TIMEOUT = 60 * 60 * 24
+# Image ``sizes`` per listing layout; the layout name is part of the key.
+CARD_SIZES = {
+    "carousel": "240px",
+    "grid": "(max-width: 600px) 50vw, 240px",
+}
+
+
+def card_key(product, layout):
+    # updated_at moves on every save, so an edited product gets a new key
+    # and its old card simply ages out.
+    return f"product-card:{layout}:{product.pk}:{product.updated_at.timestamp()}"
+
+
+@register.simple_tag
+def product_cards(products, layout="grid"):
+    """
+    Render the product cards of a listing. Cards are cached per product and
+    fetched with one get_many, so a warm grid costs one cache round trip
+    and only new or edited products go through the card template.
+    Load products with Product.objects.cards().
+    """
+    products = list(products)
+    keys = [card_key(product, layout) for product in products]
+    cards = cache.get_many(keys)
+    missing = {}
+    for key, product in zip(keys, products):
+        if key not in cards:
+            html = get_template(CARD_TEMPLATE).render({"product": product, "sizes": CARD_SIZES[layout]})
+            cards[key] = missing[key] = html
+    if missing:
+        cache.set_many(missing, CARD_TIMEOUT)
+    return mark_safe("\n".join(cards[key] for key in keys))
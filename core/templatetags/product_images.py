@@ -0,0 +1,39 @@
+from django import template
+from django.utils.html import format_html
+
+from products.images import variant_srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def product_image(product, sizes, loading="lazy"):
+    """
+    <picture> for a product image: WebP with a JPEG fallback at every
+    variant width, letting the browser pick by ``sizes``. Products whose
+    variants are not built yet get the original file.
+    """
+    image = product.image
+    webp = variant_srcset(product, "webp")
+    if not webp:
+        return format_html(
+            '<img src="{}" alt="{}" loading="{}" decoding="async">', image.url, product.name, loading
+        )
+    width, height = product.image_variants["sizes"][-1]
+    jpeg = variant_srcset(product, "jpeg")
+    # src is only used by browsers without srcset support.
+    return format_html(
+        '<picture class="media-picture">'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" loading="{}" decoding="async">'
+        "</picture>",
+        webp,
+        sizes,
+        image.url,
+        jpeg,
+        sizes,
+        width,
+        height,
+        product.name,
+        loading,
+    )
@@ -1,3 +1,448 @@
-from django.test import TestCase
+import io
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import User
+from cart.models import CartItem
+from orders.counters import get_status_counts
+from orders.models import Order, OrderItem, StockHold
+from products.models import Brand, Category, Product
+
+from .caching import CATEGORY_NAV_VERSION_KEY, get_category_nav, get_version
+from .cart import Cart, CartLine, CartSnapshot
+from .checkout import OutOfStock, hold_stock, place_order, release_expired_holds
+from .divisions import load_divisions
+from .models import Province, Ward
+from .sessions import count_expired_sessions, purge_expired_sessions
+
+
+def make_product(slug, stock, price="1000000"):
+    category, _ = Category.objects.get_or_create(slug="dien-thoai", defaults={"name": "Điện thoại"})
+    brand, _ = Brand.objects.get_or_create(name="TechOne", category=category)
+    return Product.objects.create(
+        name=f"Product {slug}",
+        slug=slug,
+        brand=brand,
+        category=category,
+        price=Decimal(price),
+        stock=stock,
+        description="",
+        image="products/test.png",
+        # No file behind the image; mark it processed so saves skip variants.
+        image_variants={"source": "products/test.png", "hash": "0" * 20, "sizes": []},
+    )
+
+
+def make_snapshot(*items):
+    return CartSnapshot(
+        CartLine(product, quantity, product.price * quantity) for product, quantity in items
+    )
+
+
+ORDER_FIELDS = {"full_name": "Khách hàng", "phone": "0900000000", "status": "pending"}
+
+
+class PlaceOrderTests(TestCase):
+    def test_creates_order_items_and_decrements_stock(self):
+        first = make_product("first", stock=5)
+        second = make_product("second", stock=5)
+
+        order = place_order(make_snapshot((first, 2), (second, 3)), **ORDER_FIELDS)
+
+        self.assertEqual(order.items.count(), 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.stock, second.stock), (3, 2))
+
+    def test_short_line_rolls_back_whole_order(self):
+        plenty = make_product("plenty", stock=10)
+        scarce = make_product("scarce", stock=1)
+
+        with self.assertRaises(OutOfStock) as ctx:
+            place_order(make_snapshot((plenty, 2), (scarce, 2)), **ORDER_FIELDS)
+
+        self.assertEqual(ctx.exception.product.pk, scarce.pk)
+        plenty.refresh_from_db()
+        self.assertEqual(plenty.stock, 10)
+        self.assertFalse(Order.objects.exists())
+
+    def test_counts_placed_orders_only(self):
+        product = make_product("counted", stock=1)
+
+        place_order(make_snapshot((product, 1)), **ORDER_FIELDS)
+        with self.assertRaises(OutOfStock):
+            place_order(make_snapshot((product, 1)), **ORDER_FIELDS)
+
+        self.assertEqual(get_status_counts()["pending"], 1)
+
+
+class StockHoldTests(TestCase):
+    def setUp(self):
+        self.buyer = User.objects.create_user("0900000001", password="secret-pass-1")
+        self.rival = User.objects.create_user("0900000002", password="secret-pass-2")
+
+    def test_hold_reduces_available_stock_for_others(self):
+        product = make_product("hot", stock=3)
+
+        hold_stock(self.buyer, make_snapshot((product, 2)))
+
+        product.refresh_from_db()
+        self.assertEqual((product.stock, product.reserved, product.available_stock), (3, 2, 1))
+        with self.assertRaises(OutOfStock):
+            hold_stock(self.rival, make_snapshot((product, 2)))
+        with self.assertRaises(OutOfStock):
+            place_order(make_snapshot((product, 2)), user=self.rival, **ORDER_FIELDS)
+
+    def test_rehold_adjusts_quantities_and_drops_removed_lines(self):
+        kept = make_product("kept", stock=5)
+        dropped = make_product("dropped", stock=5)
+        hold_stock(self.buyer, make_snapshot((kept, 1), (dropped, 2)))
+
+        hold_stock(self.buyer, make_snapshot((kept, 3)))
+
+        kept.refresh_from_db()
+        dropped.refresh_from_db()
+        self.assertEqual((kept.reserved, dropped.reserved), (3, 0))
+        self.assertEqual(StockHold.objects.filter(user=self.buyer).count(), 1)
+
+    def test_order_converts_hold_into_sale(self):
+        product = make_product("convert", stock=2)
+        snapshot = make_snapshot((product, 2))
+        hold_stock(self.buyer, snapshot)
+
+        place_order(snapshot, user=self.buyer, **ORDER_FIELDS)
+
+        product.refresh_from_db()
+        self.assertEqual((product.stock, product.reserved), (0, 0))
+        self.assertFalse(StockHold.objects.exists())
+
+    def test_deleting_a_user_releases_their_holds(self):
+        product = make_product("orphaned", stock=3)
+        hold_stock(self.buyer, make_snapshot((product, 2)))
+        hold_stock(self.rival, make_snapshot((product, 1)))
+
+        self.buyer.delete()
+
+        product.refresh_from_db()
+        self.assertEqual(product.reserved, 1)
+        self.assertEqual(StockHold.objects.count(), 1)
+
+    def test_expiry_sweep_releases_only_expired_holds(self):
+        product = make_product("sweep", stock=10)
+        hold_stock(self.buyer, make_snapshot((product, 4)))
+        hold_stock(self.rival, make_snapshot((product, 1)))
+        StockHold.objects.filter(user=self.buyer).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(release_expired_holds(), 1)
+
+        product.refresh_from_db()
+        self.assertEqual(product.reserved, 1)
+        self.assertEqual(release_expired_holds(), 0)
+
+
+class StorefrontCacheTests(TestCase):
+    def test_warm_product_page_skips_catalog_queries(self):
+        product = make_product("cached", stock=3)
+        url = f"/product/{product.slug}/"
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertContains(response, product.name)
+        self.assertFalse([query for query in queries if "products_" in query["sql"]])
+
+    def test_product_save_invalidates_page(self):
+        product = make_product("renamed", stock=3)
+        url = f"/product/{product.slug}/"
+        self.client.get(url)
+
+        product.name = "Renamed product"
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+
+        self.assertContains(self.client.get(url), "Renamed product")
+
+    def test_category_nav_is_invalidated_on_commit(self):
+        version = get_version(CATEGORY_NAV_VERSION_KEY)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Máy tính bảng", slug="may-tinh-bang")
+            self.assertEqual(get_version(CATEGORY_NAV_VERSION_KEY), version)
+
+        self.assertNotEqual(get_version(CATEGORY_NAV_VERSION_KEY), version)
+        self.assertIn("may-tinh-bang", [category["slug"] for category in get_category_nav()])
+
+    def test_unknown_slugs_are_not_cached(self):
+        with mock.patch("core.caching.cache.set") as cache_set:
+            self.assertEqual(self.client.get("/product/no-such-product/").status_code, 404)
+            self.assertEqual(self.client.get("/no-such-category/").status_code, 404)
+
+        self.assertFalse([call for call in cache_set.call_args_list if call.args[0].startswith("catalog:")])
+
+    def test_conditional_get_returns_304_until_product_changes(self):
+        product = make_product("etag", stock=3)
+        url = f"/product/{product.slug}/"
+        etag = self.client.get(url)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([query for query in queries if "products_" in query["sql"]])
+
+        product.price = Decimal("900000")
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ProductCardCacheTests(TestCase):
+    def test_warm_grid_is_one_multi_get_and_edits_rerender(self):
+        products = [make_product(f"card-{index}", stock=3) for index in range(3)]
+
+        def render():
+            template = Template("{% load product_cards %}{% product_cards products %}")
+            return template.render(Context({"products": Product.objects.cards().order_by("id")}))
+
+        render()
+
+        with mock.patch("core.templatetags.product_cards.get_template") as get_template, \
+                mock.patch("core.templatetags.product_cards.cache.get_many", wraps=cache.get_many) as get_many:
+            html = render()
+        get_template.assert_not_called()
+        get_many.assert_called_once()
+        self.assertIn(products[0].name, html)
+
+        products[0].name = "Renamed card"
+        products[0].save()
+        self.assertIn("Renamed card", render())
+
+
+class DivisionEndpointTests(TestCase):
+    DATA = [
+        {"code": 1, "name": "Thành phố Hà Nội", "wards": [{"code": 4, "name": "Phường Ba Đình"}]},
+        {"code": 79, "name": "Thành phố Hồ Chí Minh", "districts": [
+            {"code": 760, "name": "Quận 1", "wards": [{"code": 26734, "name": "Phường Bến Nghé"}]},
+        ]},
+    ]
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(load_divisions(self.DATA), (2, 2))
+
+    def test_provinces_and_wards_with_strong_etags(self):
+        response = self.client.get("/checkout/provinces/")
+        self.assertEqual([item["code"] for item in response.json()], ["1", "79"])
+        self.assertIn("public", response["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            revalidated = self.client.get("/checkout/provinces/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(revalidated.status_code, 304)
+
+        wards = self.client.get("/checkout/provinces/79/wards/").json()
+        self.assertEqual(wards, [{"code": "26734", "name": "Phường Bến Nghé"}])
+
+    def test_unknown_province_is_uncached_404(self):
+        self.client.get("/checkout/provinces/")
+
+        with mock.patch("core.divisions.cache.set") as cache_set:
+            response = self.client.get("/checkout/provinces/no-such-code/wards/")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("public", response.get("Cache-Control", ""))
+        cache_set.assert_not_called()
+
+    def test_empty_table_is_uncached_404(self):
+        cache.clear()
+        Province.objects.all().delete()
+
+        response = self.client.get("/checkout/provinces/")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("public", response.get("Cache-Control", ""))
+
+    def test_bundled_file_loads(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("load_divisions", stdout=io.StringIO())
+
+        self.assertEqual(Province.objects.count(), 34)
+        self.assertTrue(Ward.objects.filter(province__name="Thành phố Hà Nội").exists())
+
+    def test_reload_changes_etag(self):
+        etag = self.client.get("/checkout/provinces/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            load_divisions(self.DATA[:1])
+
+        response = self.client.get("/checkout/provinces/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+
+class AnonymousSessionTests(TestCase):
+    def test_browsing_anonymously_writes_no_session(self):
+        product = make_product("browse", stock=3)
+        urls = [
+            "/", f"/product/{product.slug}/", f"/{product.category.slug}/", "/search/?q=product",
+            "/account/login/", "/account/register/",
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            for url in urls:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+        self.assertFalse(Session.objects.exists())
+        self.assertFalse([query for query in queries if "django_session" in query["sql"]])
+
+    def test_guest_cart_touches_session_only_when_it_holds_items(self):
+        product = make_product("guest", stock=3)
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+
+        cart = Cart(request)
+        self.assertEqual(len(cart.snapshot()), 0)
+        self.assertFalse(request.session.modified)
+
+        cart.add(product)
+        self.assertTrue(request.session.modified)
+        cart.remove(product)
+        self.assertTrue(request.session.is_empty())
+
+
+class SessionPurgeTests(TestCase):
+    def test_purges_expired_sessions_in_batches(self):
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f"expired{i:03d}", session_data="", expire_date=now - timedelta(days=1)) for i in range(5)]
+            + [Session(session_key="live", session_data="", expire_date=now + timedelta(days=1))]
+        )
+
+        self.assertEqual(purge_expired_sessions(batch_size=3), 3)
+        self.assertEqual(count_expired_sessions(), 2)
+        self.assertEqual(purge_expired_sessions(batch_size=3), 2)
+        self.assertEqual(list(Session.objects.values_list("session_key", flat=True)), ["live"])
+
+
+class CartUpsertTests(TestCase):
+    def test_login_merges_guest_cart_in_one_statement(self):
+        kept = make_product("merge-kept", stock=5)
+        fresh = make_product("merge-fresh", stock=5)
+        user = User.objects.create_user("0900000003", password="secret-pass-3")
+        CartItem.objects.create(user=user, product=kept, quantity=2)
+        session = self.client.session
+        session["cart"] = {str(kept.pk): {"quantity": 1}, str(fresh.pk): {"quantity": 3}, "999999": {"quantity": 1}}
+        session.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post("/account/login/", {"identifier": "0900000003", "password": "secret-pass-3"})
+
+        self.assertEqual(
+            dict(CartItem.objects.filter(user=user).values_list("product_id", "quantity")),
+            {kept.pk: 3, fresh.pk: 3},
+        )
+        self.assertEqual(len([query for query in queries if "cart_cartitem" in query["sql"]]), 1)
+        self.assertNotIn("cart", self.client.session)
+
+
+class CartApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("0900000005", password="secret-pass-5")
+        self.client.force_login(self.user)
+
+    def test_line_action_returns_changed_line_and_totals(self):
+        product = make_product("api-line", stock=5, price="250000")
+
+        self.client.post(f"/cart/api/add/{product.pk}/")
+        response = self.client.post(f"/cart/api/add/{product.pk}/")
+
+        self.assertEqual(
+            response.json(),
+            {"lines": [{"product_id": product.pk, "quantity": 2, "total": 500000.0}], "count": 2, "subtotal": 500000.0},
+        )
+        self.assertEqual(self.client.get(f"/cart/api/add/{product.pk}/").status_code, 405)
+
+    def test_batch_applies_every_op(self):
+        first = make_product("api-first", stock=5)
+        second = make_product("api-second", stock=5)
+        CartItem.objects.create(user=self.user, product=second, quantity=1)
+        ops = [
+            {"action": "add", "product_id": first.pk, "quantity": 3},
+            {"action": "decrease", "product_id": first.pk},
+            {"action": "remove", "product_id": second.pk},
+        ]
+
+        response = self.client.post("/cart/api/batch/", {"ops": ops}, content_type="application/json")
+
+        payload = response.json()
+        self.assertEqual([line["quantity"] for line in payload["lines"]], [2, 0])
+        self.assertEqual(payload["count"], 2)
+        bad = self.client.post("/cart/api/batch/", {"ops": [{"action": "drop", "product_id": 1}]}, content_type="application/json")
+        self.assertEqual(bad.status_code, 400)
+
+
+@skipUnlessDBFeature("supports_update_conflicts")
+class ConcurrentCartAddTests(TransactionTestCase):
+    ADDS = 100
+    WORKERS = 16
+
+    def _add(self, user, product):
+        request = RequestFactory().post("/")
+        request.user = user
+        request.session = SessionStore()
+        try:
+            Cart(request).add(product)
+        finally:
+            connection.close()
+
+    def test_parallel_adds_lose_no_increments(self):
+        product = make_product("double-click", stock=5)
+        user = User.objects.create_user("0900000004", password="secret-pass-4")
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            list(pool.map(self._add, [user] * self.ADDS, [product] * self.ADDS))
+
+        self.assertEqual(CartItem.objects.get(user=user, product=product).quantity, self.ADDS)
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class ConcurrentCheckoutTests(TransactionTestCase):
+    CHECKOUTS = 300
+    WORKERS = 32
+    STOCK = 50
+
+    def _checkout(self, product):
+        try:
+            place_order(make_snapshot((product, 1)), **ORDER_FIELDS)
+            return True
+        except OutOfStock:
+            return False
+        finally:
+            connection.close()
+
+    def test_parallel_checkouts_never_oversell(self):
+        product = make_product("flash-sale", stock=self.STOCK)
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            results = list(pool.map(self._checkout, [product] * self.CHECKOUTS))
+
+        product.refresh_from_db()
+        self.assertEqual(results.count(True), self.STOCK)
+        self.assertEqual(product.stock, 0)
+        self.assertEqual(Order.objects.count(), self.STOCK)
+        self.assertEqual(OrderItem.objects.filter(product=product).count(), self.STOCK)
@@ -1,29 +1,94 @@
+import hashlib
+import json
 from decimal import Decimal
 from urllib.parse import urlencode, quote
 
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
 
-from orders.models import Order, OrderItem
+from orders.models import Order
 from products.models import Product, Category
+from products.search import search_products
 
-from .cart import Cart
+from .caching import CATEGORY_NAV_VERSION_KEY, get_catalog_object, get_version
+from .cart import Cart, get_cart_count
+from .checkout import OutOfStock, hold_stock, place_order
+from .divisions import province_payload, ward_payload
+
+SEARCH_PAGE_SIZE = 20
+
+# home, product_detail and category_detail cache their content block on
+# the catalog version (see the templates); the header around it, with the
+# cart badge and greeting, is still rendered per request. The querysets
+# below are lazy, so a cached page never runs them.
+#
+# Product and category pages also answer conditional GETs: the ETag is
+# built from a small validator cached next to the page, so a 304 loads
+# neither the product nor the templates.
 
 def home(request):
-    products = Product.objects.filter(is_active=True, is_featured=True)
+    products = Product.objects.cards().filter(is_active=True, is_featured=True)
     return render(request, 'core/home.html', {'products': products})
 
+def _page_etag(request, *validators):
+    # The header around the cached body (cart badge, greeting, category nav)
+    # is part of the page too, so it goes into the validator as well.
+    user = request.user
+    header = (user.pk, user.get_username(), getattr(user, 'first_name', ''),
+              get_cart_count(request), get_version(CATEGORY_NAV_VERSION_KEY))
+    raw = '|'.join(str(part) for part in (*validators, *header))
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+def _product_etag(request, slug):
+    updated_at = get_catalog_object(
+        f'product-validator:{slug}',
+        lambda: Product.objects.filter(slug=slug, is_active=True).values_list('updated_at', flat=True).first(),
+    )
+    if updated_at is None:
+        return None
+    return _page_etag(request, 'product', slug, updated_at.isoformat())
+
+def _category_etag(request, slug):
+    def validator():
+        category = Category.objects.filter(slug=slug).values('id', 'updated_at').first()
+        if category is None:
+            return None
+        products = Product.objects.filter(category_id=category['id'], is_active=True).aggregate(
+            count=Count('id'), latest=Max('updated_at')
+        )
+        return (category['updated_at'], products['count'], products['latest'])
+
+    validator = get_catalog_object(f'category-validator:{slug}', validator)
+    if validator is None:
+        return None
+    return _page_etag(request, 'category', slug, *validator)
+
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_product_etag)
 def product_detail(request, slug):
-    product = get_object_or_404(Product, slug=slug, is_active=True)
+    product = get_catalog_object(
+        f'product:{slug}', lambda: Product.objects.filter(slug=slug, is_active=True).first()
+    )
+    if product is None:
+        raise Http404
     return render(request, 'core/product_detail.html', {'product': product})
 
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_category_etag)
 def category_detail(request, slug):
-    category = get_object_or_404(Category, slug=slug)
-    products = Product.objects.filter(category=category, is_active=True)
+    category = get_catalog_object(f'category:{slug}', lambda: Category.objects.filter(slug=slug).first())
+    if category is None:
+        raise Http404
+    products = Product.objects.cards().filter(category=category, is_active=True)
 
     return render(request, 'core/category_detail.html', {
         'category': category,
@@ -33,22 +98,22 @@ def category_detail(request, slug):
 def search(request):
     query = request.GET.get('q')
     products = []
+    page_obj = None
 
     if query:
-        products = Product.objects.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query),
-            is_active=True
-        )
+        results = search_products(Product.objects.cards().filter(is_active=True), query)
+        page_obj = Paginator(results, SEARCH_PAGE_SIZE).get_page(request.GET.get('page'))
+        products = page_obj.object_list
 
     return render(request, 'core/search.html', {
         'products': products,
+        'page_obj': page_obj,
         'query': query
     })
 
 
-def _get_cart_totals(cart):
-    subtotal = cart.get_total_price() or Decimal("0")
+def _get_cart_totals(snapshot):
+    subtotal = snapshot.subtotal
     discount = Decimal("0")
     shipping = Decimal("0")
     total = subtotal - discount + shipping
@@ -82,7 +147,7 @@ def _build_vietqr_url(total):
 @login_required
 def cart_detail(request):
     cart = Cart(request)
-    return render(request, 'cart.html', {'cart': cart})
+    return render(request, 'cart.html', {'cart': cart.snapshot()})
 
 
 @login_required
@@ -109,10 +174,113 @@ def cart_remove(request, product_id):
     return redirect('cart')
 
 
+CART_ACTIONS = ('add', 'decrease', 'remove')
+CART_BATCH_LIMIT = 50
+CART_MAX_QUANTITY = 99
+
+
+def _apply_cart_action(cart, action, product_id, quantity=1):
+    if action == 'add':
+        cart.add(product_id, quantity)
+    elif action == 'decrease':
+        cart.decrease(product_id)
+    else:
+        cart.remove(product_id)
+
+
+def _cart_payload(cart, product_ids):
+    # One cart SELECT after the mutations: the touched lines (quantity 0
+    # once removed), the totals and the header badge count.
+    snapshot = cart.snapshot()
+    by_id = {line.product.id: line for line in snapshot}
+    lines = []
+    for product_id in product_ids:
+        line = by_id.get(product_id)
+        lines.append({
+            'product_id': product_id,
+            'quantity': line.quantity if line else 0,
+            'total': float(line.total_price) if line else 0.0,
+        })
+    return {
+        'lines': lines,
+        'count': snapshot.total_quantity,
+        'subtotal': float(snapshot.subtotal),
+    }
+
+
 @login_required
-def checkout_info(request):
+@require_POST
+def cart_api_line(request, action, product_id):
+    if action not in CART_ACTIONS:
+        raise Http404
+    cart = Cart(request)
+    _apply_cart_action(cart, action, product_id)
+    return JsonResponse(_cart_payload(cart, [product_id]))
+
+
+@login_required
+@require_POST
+def cart_api_batch(request):
+    """
+    Apply several cart changes in one request. The body is
+    {"ops": [{"action": "add", "product_id": 1, "quantity": 2}, ...]}.
+    """
+    try:
+        ops = json.loads(request.body)['ops']
+        parsed = [
+            (op['action'], int(op['product_id']), int(op.get('quantity', 1)))
+            for op in ops[:CART_BATCH_LIMIT + 1]
+        ]
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return JsonResponse({'error': 'Yêu cầu không hợp lệ.'}, status=400)
+    if not parsed or len(parsed) > CART_BATCH_LIMIT or any(
+        action not in CART_ACTIONS or not 1 <= quantity <= CART_MAX_QUANTITY for action, _, quantity in parsed
+    ):
+        return JsonResponse({'error': 'Yêu cầu không hợp lệ.'}, status=400)
+
     cart = Cart(request)
-    if cart.get_total_quantity() <= 0:
+    with transaction.atomic():
+        for action, product_id, quantity in parsed:
+            _apply_cart_action(cart, action, product_id, quantity)
+    product_ids = list(dict.fromkeys(product_id for _, product_id, _ in parsed))
+    return JsonResponse(_cart_payload(cart, product_ids))
+
+
+# Address picker data. Shared by every visitor, so public caches may keep
+# it for a day and then revalidate against the content-hash ETag.
+DIVISIONS_CACHE = {'public': True, 'max_age': 60 * 60 * 24, 'stale_while_revalidate': 60 * 60 * 24 * 7}
+
+
+def _divisions_response(request, body, etag):
+    etag = quote_etag(etag)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, **DIVISIONS_CACHE)
+    return response
+
+
+# A 404 goes out without the public cache headers, so an empty table or an
+# unknown code is not kept by browsers or CDNs once the data is loaded.
+def province_list(request):
+    body, etag = province_payload()
+    if body is None:
+        raise Http404
+    return _divisions_response(request, body, etag)
+
+
+def ward_list(request, code):
+    body, etag = ward_payload(code)
+    if body is None:
+        raise Http404
+    return _divisions_response(request, body, etag)
+
+
+@login_required
+def checkout_info(request):
+    snapshot = Cart(request).snapshot()
+    if snapshot.total_quantity <= 0:
         return redirect("cart")
 
     errors = {}
@@ -173,12 +341,21 @@ def checkout_info(request):
         if not errors:
             request.session["checkout_info"] = form_data
             request.session.modified = True
-            return redirect("checkout_payment")
 
-    subtotal, discount, shipping, total = _get_cart_totals(cart)
+    # Checkout has started: hold the cart lines so they cannot sell out
+    # between here and the payment step.
+    try:
+        hold_stock(request.user, snapshot)
+    except OutOfStock as exc:
+        errors["stock"] = f"Sản phẩm {exc.product.name} không đủ số lượng."
+
+    if request.method == "POST" and not errors:
+        return redirect("checkout_payment")
+
+    subtotal, discount, shipping, total = _get_cart_totals(snapshot)
 
     context = {
-        "cart": cart,
+        "cart": snapshot,
         "subtotal": subtotal,
         "discount": discount,
         "shipping": shipping,
@@ -193,7 +370,8 @@ def checkout_info(request):
 @login_required
 def checkout_payment(request):
     cart = Cart(request)
-    if cart.get_total_quantity() <= 0:
+    snapshot = cart.snapshot()
+    if snapshot.total_quantity <= 0:
         return redirect("cart")
 
     checkout_info = request.session.get("checkout_info")
@@ -202,7 +380,7 @@ def checkout_payment(request):
     if not checkout_info:
         return redirect("checkout_info")
 
-    subtotal, discount, shipping, total = _get_cart_totals(cart)
+    subtotal, discount, shipping, total = _get_cart_totals(snapshot)
     bank_qr_url = _build_vietqr_url(total)
     errors = {}
     payment_method = "cod"
@@ -215,56 +393,45 @@ def checkout_payment(request):
         if payment_method not in {"cod", "wallet", "bank"}:
             errors["payment_method"] = "Vui lòng chọn phương thức thanh toán hợp lệ."
 
-        for item in cart:
-            if item["product"].stock < item["quantity"]:
-                errors["stock"] = f"Sản phẩm {item['product'].name} không đủ số lượng."
-                break
-
         if not errors:
-            with transaction.atomic():
-                order = Order.objects.create(
-                    user=request.user,
-                    full_name=checkout_info.get("full_name") or request.user.get_full_name() or request.user.username,
-                    phone=checkout_info.get("phone") or "",
-                    email=checkout_info.get("email") or "",
-                    delivery_method=checkout_info.get("delivery_method") or "delivery",
-                    city=checkout_info.get("city_name") or checkout_info.get("city") or "",
-                    ward=checkout_info.get("ward_name") or checkout_info.get("ward") or "",
-                    address=checkout_info.get("address") or "",
-                    delivery_time=checkout_info.get("delivery_time") or "",
-                    note=checkout_info.get("note") or "",
-                    invoice_required=bool(checkout_info.get("invoice_required")),
-                    payment_method=payment_method,
-                    coupon_code=coupon_code,
-                    subtotal=subtotal,
-                    discount=discount,
-                    shipping=shipping,
-                    total=total,
-                    status="pending",
-                )
-
-                for item in cart:
-                    product = item["product"]
-                    quantity = item["quantity"]
-                    OrderItem.objects.create(
-                        order=order,
-                        product=product,
-                        product_name=product.name,
-                        price=product.price,
-                        quantity=quantity,
-                        total=product.price * quantity,
+            try:
+                with transaction.atomic():
+                    order = place_order(
+                        snapshot,
+                        user=request.user,
+                        full_name=checkout_info.get("full_name") or request.user.get_full_name() or request.user.username,
+                        phone=checkout_info.get("phone") or "",
+                        email=checkout_info.get("email") or "",
+                        delivery_method=checkout_info.get("delivery_method") or "delivery",
+                        city=checkout_info.get("city_name") or checkout_info.get("city") or "",
+                        ward=checkout_info.get("ward_name") or checkout_info.get("ward") or "",
+                        address=checkout_info.get("address") or "",
+                        delivery_time=checkout_info.get("delivery_time") or "",
+                        note=checkout_info.get("note") or "",
+                        invoice_required=bool(checkout_info.get("invoice_required")),
+                        payment_method=payment_method,
+                        coupon_code=coupon_code,
+                        subtotal=subtotal,
+                        discount=discount,
+                        shipping=shipping,
+                        total=total,
+                        status="pending",
                     )
-                    product.stock = max(product.stock - quantity, 0)
-                    product.save(update_fields=["stock"])
-
-                cart.clear()
-                request.session.pop("checkout_info", None)
-                request.session.modified = True
-
-            return redirect("checkout_success", order_id=order.id)
+                    cart.clear()
+                    request.session.pop("checkout_info", None)
+                    request.session.modified = True
+            except OutOfStock as exc:
+                errors["stock"] = f"Sản phẩm {exc.product.name} không đủ số lượng."
+            else:
+                return redirect("checkout_success", order_id=order.id)
+    else:
+        try:
+            hold_stock(request.user, snapshot)
+        except OutOfStock as exc:
+            errors["stock"] = f"Sản phẩm {exc.product.name} không đủ số lượng."
 
     context = {
-        "cart": cart,
+        "cart": snapshot,
         "subtotal": subtotal,
         "discount": discount,
         "shipping": shipping,
@@ -0,0 +1,147 @@
+import base64
+import datetime
+import decimal
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor=None, previous_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def _split(ordering):
+    return [(name.lstrip("-"), name.startswith("-")) for name in ordering]
+
+
+def _jsonable(value):
+    # isoformat() keeps microseconds; DjangoJSONEncoder truncates them, which
+    # would make the seek predicate skip rows sharing the same millisecond.
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values):
+    raw = json.dumps([_jsonable(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(model, ordering, cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    fields = _split(ordering)
+    if not isinstance(values, list) or len(values) != len(fields):
+        return None
+    try:
+        values = [
+            model._meta.get_field(name).to_python(value)
+            for (name, _), value in zip(fields, values)
+        ]
+    except (ValidationError, TypeError, ValueError):
+        return None
+    # to_python() passes None through, and a seek lookup can't compare to it.
+    if any(value is None for value in values):
+        return None
+    return values
+
+
+def _seek_filter(ordering, values, backwards=False):
+    """
+    Build the "row comes after (values)" predicate for a multi-column sort,
+    e.g. created_at < v0 OR (created_at = v0 AND id < v1) for
+    ("-created_at", "-id"). Matches the composite index on those columns.
+    """
+    condition = Q()
+    equal = {}
+    for (name, descending), value in zip(_split(ordering), values):
+        lookup = "lt" if descending != backwards else "gt"
+        condition |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+    return condition
+
+
+def _reverse(ordering):
+    return [name[1:] if name.startswith("-") else f"-{name}" for name in ordering]
+
+
+def _cursor_for(obj, ordering):
+    return encode_cursor([getattr(obj, name) for name, _ in _split(ordering)])
+
+
+def paginate_keyset(queryset, ordering, page_size, after=None, before=None):
+    """
+    Seek-based pagination: every page costs one indexed range scan of
+    page_size + 1 rows, no matter how deep the user has paged.
+
+    ``ordering`` must end with a unique column (normally "-id").
+    """
+    model = queryset.model
+    after_values = decode_cursor(model, ordering, after) if after else None
+    before_values = decode_cursor(model, ordering, before) if before else None
+
+    if before_values is not None:
+        rows = list(
+            queryset.filter(_seek_filter(ordering, before_values, backwards=True))
+            .order_by(*_reverse(ordering))[: page_size + 1]
+        )
+        has_more = len(rows) > page_size
+        items = rows[:page_size][::-1]
+        next_cursor = _cursor_for(items[-1], ordering) if items else None
+        previous_cursor = _cursor_for(items[0], ordering) if items and has_more else None
+        return KeysetPage(items, next_cursor, previous_cursor)
+
+    if after_values is not None:
+        queryset = queryset.filter(_seek_filter(ordering, after_values))
+    rows = list(queryset.order_by(*ordering)[: page_size + 1])
+    has_more = len(rows) > page_size
+    items = rows[:page_size]
+    next_cursor = _cursor_for(items[-1], ordering) if items and has_more else None
+    previous_cursor = _cursor_for(items[0], ordering) if items and after_values is not None else None
+    return KeysetPage(items, next_cursor, previous_cursor)
+
+
+def cursor_query(request, page):
+    """Query strings for the pager links, keeping the current filters."""
+    params = request.GET.copy()
+    params.pop("after", None)
+    params.pop("before", None)
+    links = {"next": None, "previous": None}
+    if page.has_next:
+        params["after"] = page.next_cursor
+        links["next"] = params.urlencode()
+        params.pop("after")
+    if page.has_previous:
+        params["before"] = page.previous_cursor
+        links["previous"] = params.urlencode()
+    return links
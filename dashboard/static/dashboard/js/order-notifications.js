@@ -7,6 +7,8 @@
     const list = root.querySelector("[data-notify-list]");
     const badge = root.querySelector("[data-notify-badge]");
     const endpoint = "/dashboard/orders/notifications/";
+    const streamEndpoint = "/dashboard/orders/stream/";
+    const maxRecent = 5;
 
     let unreadCount = 0;
     let isOpen = false;
@@ -76,10 +78,13 @@
         badge.hidden = count <= 0;
     };
 
+    let recentOrders = [];
+
     const renderOrders = (orders) => {
+        recentOrders = (orders || []).slice(0, maxRecent);
         if (!list) return;
         list.innerHTML = "";
-        if (!orders || !orders.length) {
+        if (!recentOrders.length) {
             const empty = document.createElement("div");
             empty.className = "empty-state";
             empty.textContent = "Chưa có đơn hàng mới.";
@@ -87,7 +92,7 @@
             return;
         }
 
-        orders.forEach((order) => {
+        recentOrders.forEach((order) => {
             const item = document.createElement("a");
             item.className = "notify-item";
             item.href = `/dashboard/orders/${order.id}/`;
@@ -99,13 +104,21 @@
         });
     };
 
+    let watermark = null;
+
     const fetchNotifications = async () => {
         try {
+            const headers = { "X-Requested-With": "XMLHttpRequest" };
+            if (watermark) {
+                headers["If-None-Match"] = watermark;
+            }
             const response = await fetch(endpoint, {
-                headers: { "X-Requested-With": "XMLHttpRequest" },
+                headers,
                 credentials: "same-origin",
+                cache: "no-store",
             });
-            if (!response.ok) return;
+            if (response.status === 304 || !response.ok) return;
+            watermark = response.headers.get("ETag");
             const data = await response.json();
             renderOrders(data.orders || []);
 
@@ -141,6 +154,43 @@
         }
     });
 
+    const poll = () => {
+        setInterval(fetchNotifications, 5000);
+    };
+
+    const listen = () => {
+        const source = new EventSource(streamEndpoint, { withCredentials: true });
+        let pollingStarted = false;
+        // The stream only runs under ASGI; a WSGI server answers 204 (an
+        // error here) or never gets round to sending headers.
+        const fallBack = () => {
+            if (pollingStarted) return;
+            pollingStarted = true;
+            clearTimeout(openTimer);
+            source.close();
+            fetchNotifications();
+            poll();
+        };
+        const openTimer = setTimeout(fallBack, 10000);
+        source.onopen = () => clearTimeout(openTimer);
+        source.onerror = fallBack;
+        source.addEventListener("order", (event) => {
+            let order = null;
+            try {
+                order = JSON.parse(event.data);
+            } catch (error) {
+                return;
+            }
+            renderOrders([order, ...recentOrders.filter((item) => item.id !== order.id)]);
+            setBadge(unreadCount + 1);
+            playSound();
+        });
+    };
+
     fetchNotifications();
-    setInterval(fetchNotifications, 5000);
+    if (window.EventSource) {
+        listen();
+    } else {
+        poll();
+    }
 })();
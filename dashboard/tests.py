@@ -1,3 +1,108 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from orders.models import Order
+
+from .pagination import encode_cursor
+
+
+class StaffClientMixin:
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user("0900000009", password="secret-pass-9", is_staff=True)
+        self.client.force_login(self.staff)
+        self.client.cookies["admin_sessionid"] = self.client.cookies["sessionid"].value
+
+
+class OrderNotificationTests(StaffClientMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("order_notifications")
+
+    def _create_order(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Order.objects.create(full_name="Khách hàng", phone="0900000000", total=Decimal("1000"))
+
+    def test_unchanged_watermark_is_not_modified_without_order_queries(self):
+        self._create_order()
+        etag = self.client.get(self.url)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([query for query in queries if "orders_order" in query["sql"]])
+
+    def test_counts_orders_created_since_last_poll(self):
+        self.client.get(self.url)
+        self._create_order()
+        self._create_order()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.json()["new_count"], 2)
+        self.assertEqual(self.client.get(self.url).json()["new_count"], 0)
+        self.assertNotIn("orders_last_seen_id", self.client.session)
+
+    def test_stream_declines_under_wsgi(self):
+        # The test client is WSGI; the page falls back to polling on 204.
+        response = self.client.get(reverse("order_stream"))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(response.streaming)
+
+
+class CustomerListTests(StaffClientMixin, TestCase):
+    def test_prefix_search_ignores_case(self):
+        User.objects.create_user("AnhTuan", email="Anh.Tuan@Example.vn", phone="0911000001")
+        User.objects.create_user("binh", email="binh@example.vn", phone="0911000002")
+
+        for query in ("anh", "ANHT", "anh.tuan@example", "0911000001"):
+            response = self.client.get(reverse("customer_list"), {"q": query})
+            self.assertEqual([user.username for user in response.context["customers"]], ["AnhTuan"], query)
+
+
+class OrderListPaginationTests(StaffClientMixin, TestCase):
+    def _page(self, query=""):
+        response = self.client.get(f"{reverse('order_list')}?{query}")
+        self.assertEqual(response.status_code, 200)
+        return [order.pk for order in response.context["orders"]], response.context["page_links"]
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        for _ in range(3):
+            order = Order.objects.create(full_name="Khách hàng", phone="0900000000")
+        first_page, _ = self._page()
+
+        forged = ([None, order.pk], [order.created_at, None], [{"a": 1}, order.pk], [123, [order.pk]])
+        cursors = ["not-base64!", "W10", encode_cursor(["yesterday", 1]), encode_cursor([None, "x"])]
+        for cursor in cursors + [encode_cursor(values) for values in forged]:
+            self.assertEqual(self._page(f"after={cursor}")[0], first_page, cursor)
+            self.assertEqual(self._page(f"before={cursor}")[0], first_page, cursor)
+
+    @mock.patch("dashboard.views.ORDER_PAGE_SIZE", 3)
+    def test_tied_timestamps_neither_skip_nor_repeat_rows(self):
+        for _ in range(8):
+            Order.objects.create(full_name="Khách hàng", phone="0900000000")
+        Order.objects.update(created_at=datetime(2026, 1, 1, 9, 30, tzinfo=timezone.utc))
+        expected = list(Order.objects.order_by("-id").values_list("pk", flat=True))
+
+        seen, links = self._page()
+        while links["next"]:
+            ids, links = self._page(links["next"])
+            seen += ids
+        self.assertEqual(seen, expected)
 
-# Create your tests here.
+        # Walk back from the last page, which holds the final two rows.
+        seen = []
+        while links["previous"]:
+            ids, links = self._page(links["previous"])
+            seen = ids + seen
+        self.assertEqual(seen, expected[:-2])
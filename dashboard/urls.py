@@ -22,4 +22,5 @@ urlpatterns = [
     path("orders/", views.order_list, name="order_list"),
     path("orders/<int:id>/", views.order_detail, name="order_detail"),
     path("orders/notifications/", views.order_notifications, name="order_notifications"),
+    path("orders/stream/", views.order_stream, name="order_stream"),
 ]
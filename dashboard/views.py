@@ -1,15 +1,55 @@
-from django.contrib.auth import authenticate, login, logout, get_user_model
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from functools import partial
+
+from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import user_passes_test
-from django.db.models import Count
-from django.http import JsonResponse
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.db.models import Q
+from django.db.models.functions import Lower
 from django.shortcuts import render, redirect, get_object_or_404
+from django.utils.dateparse import parse_date
 from django.utils.text import slugify
 from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 
+from accounts.identifiers import normalize_phone
 from accounts.models import User
 from products.models import Category, Brand, Product
+from orders.events import ORDER_CHANNEL, event_stream
+from orders.counters import change_status, get_status_counts
 from orders.models import Order
+from orders.notifications import get_last_seen, get_latest_order_id, get_recent_orders, set_last_seen
+from orders.rollups import read_series, read_top
+from products.search import match_products
+from products.storage import release_image
+
+from .pagination import cursor_query, paginate_keyset
+
+ORDER_PAGE_SIZE = 25
+ORDER_LIST_ORDERING = ("-created_at", "-id")
+
+SALES_RANGES = {"30": 30, "90": 90}
+
+PRODUCT_PAGE_SIZE = 30
+PRODUCT_SORTS = {
+    "newest": ("Mới nhất", ("-created_at", "-id")),
+    "name": ("Tên A-Z", ("name", "id")),
+    "price_asc": ("Giá tăng dần", ("price", "id")),
+    "price_desc": ("Giá giảm dần", ("-price", "-id")),
+    "stock_asc": ("Tồn kho thấp nhất", ("stock", "id")),
+    "stock_desc": ("Tồn kho cao nhất", ("-stock", "-id")),
+}
+
+CUSTOMER_PAGE_SIZE = 30
+CUSTOMER_SORTS = {
+    "newest": ("Mới đăng ký", ("-date_joined", "-id")),
+    "oldest": ("Đăng ký sớm nhất", ("date_joined", "id")),
+    "username": ("Tên đăng nhập", ("username", "id")),
+}
 
 def admin_login(request):
     if request.user.is_authenticated and request.user.is_staff:
@@ -25,20 +65,7 @@ def admin_login(request):
         user = None
 
         if identifier:
-            lookup_phone = identifier
-            if "@" not in identifier:
-                normalized = "".join(ch for ch in identifier if ch.isdigit() or ch == "+")
-                if normalized:
-                    lookup_phone = normalized
-            user_model = get_user_model()
-            candidate = user_model.objects.filter(
-                Q(email__iexact=identifier) | Q(phone=lookup_phone) | Q(username__iexact=identifier)
-            ).first()
-            if candidate:
-                user = authenticate(request, username=candidate.username, password=password)
-
-        if user is None and identifier:
-            user = authenticate(request, username=identifier, password=password)
+            user = authenticate(request, identifier=identifier, password=password)
 
         if user is not None and user.is_staff:
             login(request, user)
@@ -60,9 +87,102 @@ def admin_logout(request):
 def staff_required(view_func):
     return user_passes_test(lambda u: u.is_staff, login_url="admin_login")(view_func)
 
+
+def _int_param(request, name):
+    try:
+        return int(request.GET.get(name, ""))
+    except ValueError:
+        return None
+
+
+def _flag_param(request, name):
+    value = request.GET.get(name, "")
+    if value == "1":
+        return True
+    if value == "0":
+        return False
+    return None
+
+
+def _date_param(request, name):
+    try:
+        return parse_date(request.GET.get(name, "").strip())
+    except ValueError:
+        return None
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _sort_param(request, sorts):
+    sort = request.GET.get("sort", "")
+    if sort not in sorts:
+        sort = next(iter(sorts))
+    return sort, sorts[sort][1]
+
 @staff_required
 def dashboard_home(request):
-    return render(request, "dashboard/home.html")
+    days = SALES_RANGES.get(request.GET.get("range"), SALES_RANGES["30"])
+    end = timezone.localdate()
+    start = end - timedelta(days=days - 1)
+
+    series = read_series(start, end)
+    previous = read_series(start - timedelta(days=days), start - timedelta(days=1))
+    peak = max((revenue for _, _, _, revenue in series), default=0) or 1
+    chart = [
+        {"day": day, "orders": orders, "revenue": revenue, "height": float(revenue / peak * 100)}
+        for day, orders, _, revenue in series
+    ]
+
+    def totals(rows):
+        orders = sum(row[1] for row in rows)
+        units = sum(row[2] for row in rows)
+        revenue = sum((row[3] for row in rows), Decimal("0"))
+        return {
+            "orders": orders,
+            "units": units,
+            "revenue": revenue,
+            "average": revenue / orders if orders else Decimal("0"),
+        }
+
+    current_totals = totals(series)
+    previous_totals = totals(previous)
+    kpis = []
+    for key, label in (
+        ("revenue", "Doanh thu"),
+        ("orders", "Đơn hoàn thành"),
+        ("average", "Giá trị TB / đơn"),
+        ("units", "Sản phẩm đã bán"),
+    ):
+        value, before = current_totals[key], previous_totals[key]
+        change = round((value - before) / before * 100) if before else None
+        kpis.append({"key": key, "label": label, "value": value, "change": change})
+
+    context = {
+        "range_days": days,
+        "range_options": SALES_RANGES,
+        "kpis": kpis,
+        "chart": chart,
+        "breakdowns": [
+            ("Sản phẩm bán chạy", _label_top(read_top(start, end, "product"), Product)),
+            ("Nhãn hàng", _label_top(read_top(start, end, "brand"), Brand)),
+            ("Hạng mục", _label_top(read_top(start, end, "category"), Category)),
+            ("Phương thức thanh toán", _label_top(read_top(start, end, "payment"), dict(Order.PAYMENT_CHOICES))),
+            ("Hình thức nhận hàng", _label_top(read_top(start, end, "delivery"), dict(Order.DELIVERY_CHOICES))),
+        ],
+    }
+    return render(request, "dashboard/home.html", context)
+
+
+def _label_top(rows, labels):
+    """Attach display names to read_top() rows; ``labels`` is a model or a choices dict."""
+    if not isinstance(labels, dict):
+        ids = [int(row["key"]) for row in rows]
+        labels = {str(pk): name for pk, name in labels.objects.filter(pk__in=ids).values_list("pk", "name")}
+    for row in rows:
+        row["label"] = labels.get(row["key"], row["key"])
+    return rows
 
 @staff_required
 def category_list(request):
@@ -160,13 +280,62 @@ def brand_delete(request, id):
 
 @staff_required
 def product_list(request):
-    products = Product.objects.select_related("brand", "category").all()
+    query = request.GET.get("q", "").strip()
+    category_id = _int_param(request, "category")
+    brand_id = _int_param(request, "brand")
+    is_active = _flag_param(request, "active")
+    is_featured = _flag_param(request, "featured")
+    stock_min = _int_param(request, "stock_min")
+    stock_max = _int_param(request, "stock_max")
+    sort, ordering = _sort_param(request, PRODUCT_SORTS)
+
+    products = Product.objects.select_related("category").cards(
+        "stock", "created_at", "category__name", with_brand=True
+    )
+    if query:
+        products = match_products(products, query)
+    if category_id is not None:
+        products = products.filter(category_id=category_id)
+    if brand_id is not None:
+        products = products.filter(brand_id=brand_id)
+    if is_active is not None:
+        products = products.filter(is_active=is_active)
+    if is_featured is not None:
+        products = products.filter(is_featured=is_featured)
+    if stock_min is not None:
+        products = products.filter(stock__gte=stock_min)
+    if stock_max is not None:
+        products = products.filter(stock__lte=stock_max)
+
+    page = paginate_keyset(
+        products,
+        ordering,
+        PRODUCT_PAGE_SIZE,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+    )
     categories = Category.objects.all()
     brands = Brand.objects.all()
     return render(
         request,
         "dashboard/product_list.html",
-        {"products": products, "categories": categories, "brands": brands},
+        {
+            "products": page,
+            "page_links": cursor_query(request, page),
+            "categories": categories,
+            "brands": brands,
+            "sorts": [(key, label) for key, (label, _) in PRODUCT_SORTS.items()],
+            "filters": {
+                "q": query,
+                "category": category_id,
+                "brand": brand_id,
+                "active": request.GET.get("active", ""),
+                "featured": request.GET.get("featured", ""),
+                "stock_min": stock_min,
+                "stock_max": stock_max,
+                "sort": sort,
+            },
+        },
     )
 
 
@@ -192,20 +361,22 @@ def product_create(request):
         if name and category_id and brand_id and image:
             category = get_object_or_404(Category, id=category_id)
             brand = get_object_or_404(Brand, id=brand_id)
-            Product.objects.create(
-                name=name,
-                slug=slug,
-                category=category,
-                brand=brand,
-                price=price,
-                old_price=old_price or None,
-                stock=stock,
-                description=description,
-                specifications=specifications,
-                image=image,
-                is_active=is_active,
-                is_featured=is_featured,
-            )
+            # One transaction with the image upload; see products.storage.
+            with transaction.atomic():
+                Product.objects.create(
+                    name=name,
+                    slug=slug,
+                    category=category,
+                    brand=brand,
+                    price=price,
+                    old_price=old_price or None,
+                    stock=stock,
+                    description=description,
+                    specifications=specifications,
+                    image=image,
+                    is_active=is_active,
+                    is_featured=is_featured,
+                )
             return redirect("product_list")
 
     return render(
@@ -249,9 +420,20 @@ def product_edit(request, id):
             product.specifications = specifications
             product.is_active = is_active
             product.is_featured = is_featured
+            update_fields = [
+                "name", "slug", "category", "brand", "price", "old_price", "stock",
+                "description", "specifications", "is_active", "is_featured", "updated_at",
+            ]
+            previous_image = (product.image.name, product.image_variants)
             if image:
                 product.image = image
-            product.save()
+                update_fields.append("image")
+            # Leave Product.reserved alone; checkout holds change it concurrently.
+            # The upload and the row update share a transaction (products.storage).
+            with transaction.atomic():
+                product.save(update_fields=update_fields)
+                if image and product.image.name != previous_image[0]:
+                    transaction.on_commit(partial(release_image, *previous_image))
             return redirect("product_list")
 
     return render(
@@ -270,8 +452,48 @@ def product_delete(request, id):
 
 @staff_required
 def customer_list(request):
-    customers = User.objects.filter(role="customer").order_by("-date_joined")
-    return render(request, "dashboard/customer_list.html", {"customers": customers})
+    query = request.GET.get("q", "").strip()
+    joined_from = _date_param(request, "joined_from")
+    joined_to = _date_param(request, "joined_to")
+    sort, ordering = _sort_param(request, CUSTOMER_SORTS)
+
+    customers = User.objects.filter(role="customer")
+    if query:
+        # Case-insensitive prefix matches against LOWER() expressions, so
+        # every branch can use a pattern_ops btree index.
+        folded = query.lower()
+        phone = normalize_phone(query)
+        condition = Q(username_ci__startswith=folded) | Q(email_ci__startswith=folded)
+        if phone:
+            condition |= Q(phone__startswith=phone)
+        customers = customers.alias(email_ci=Lower("email"), username_ci=Lower("username")).filter(condition)
+    if joined_from:
+        customers = customers.filter(date_joined__gte=_start_of_day(joined_from))
+    if joined_to:
+        customers = customers.filter(date_joined__lt=_start_of_day(joined_to + timedelta(days=1)))
+
+    page = paginate_keyset(
+        customers,
+        ordering,
+        CUSTOMER_PAGE_SIZE,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+    )
+    return render(
+        request,
+        "dashboard/customer_list.html",
+        {
+            "customers": page,
+            "page_links": cursor_query(request, page),
+            "sorts": [(key, label) for key, (label, _) in CUSTOMER_SORTS.items()],
+            "filters": {
+                "q": query,
+                "joined_from": joined_from,
+                "joined_to": joined_to,
+                "sort": sort,
+            },
+        },
+    )
 
 
 @staff_required
@@ -283,21 +505,33 @@ def customer_detail(request, id):
 @staff_required
 def order_list(request):
     status_filter = request.GET.get("status", "").strip()
-    orders = Order.objects.select_related("user").order_by("-created_at")
+    orders = Order.objects.select_related("user")
     if status_filter:
         orders = orders.filter(status=status_filter)
 
-    status_counts = {key: 0 for key, _ in Order.STATUS_CHOICES}
-    for entry in Order.objects.values("status").annotate(total=Count("id")):
-        status_counts[entry["status"]] = entry["total"]
+    page = paginate_keyset(
+        orders,
+        ORDER_LIST_ORDERING,
+        ORDER_PAGE_SIZE,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+    )
+
+    status_counts = get_status_counts()
 
     status_summary = [
         {"key": key, "label": label, "count": status_counts.get(key, 0)}
         for key, label in Order.STATUS_CHOICES
     ]
+    if status_filter:
+        total_count = status_counts.get(status_filter, 0)
+    else:
+        total_count = sum(status_counts.values())
 
     context = {
-        "orders": orders,
+        "orders": page,
+        "page_links": cursor_query(request, page),
+        "total_count": total_count,
         "status_filter": status_filter,
         "status_summary": status_summary,
     }
@@ -317,8 +551,7 @@ def order_detail(request, id):
     if request.method == "POST":
         new_status = request.POST.get("status", "").strip()
         if next_status and new_status == next_status:
-            order.status = new_status
-            order.save(update_fields=["status", "updated_at"])
+            change_status(order, new_status)
         return redirect("order_detail", id=order.id)
 
     return render(
@@ -333,35 +566,46 @@ def order_detail(request, id):
     )
 
 
+def _order_watermark_etag(request):
+    return f"orders-{get_latest_order_id()}"
+
+
 @staff_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_order_watermark_etag)
 def order_notifications(request):
-    latest_order = Order.objects.order_by("-id").first()
-    last_seen_id = request.session.get("orders_last_seen_id")
+    # Answered from the cache: when the watermark is unchanged the client
+    # gets a 304 before any query runs, and the session is never written.
+    latest_id = get_latest_order_id()
+    last_seen_id = get_last_seen(request.user)
 
+    new_count = 0
     if last_seen_id is None:
-        request.session["orders_last_seen_id"] = latest_order.id if latest_order else 0
-        last_seen_id = request.session["orders_last_seen_id"]
-
-    new_orders = Order.objects.filter(id__gt=last_seen_id).order_by("-id")
-    new_count = new_orders.count()
-
-    if new_count:
-        request.session["orders_last_seen_id"] = new_orders.first().id
-
-    recent_orders = Order.objects.order_by("-id")[:5]
+        set_last_seen(request.user, latest_id)
+    elif latest_id > last_seen_id:
+        new_count = Order.objects.filter(id__gt=last_seen_id, id__lte=latest_id).count()
+        set_last_seen(request.user, latest_id)
 
     payload = {
         "new_count": new_count,
         "server_time": timezone.now().isoformat(),
-        "orders": [
-            {
-                "id": order.id,
-                "full_name": order.full_name,
-                "total": float(order.total),
-                "created_at": order.created_at.isoformat(),
-                "status": order.get_status_display(),
-            }
-            for order in recent_orders
-        ],
+        "orders": get_recent_orders(latest_id),
     }
     return JsonResponse(payload)
+
+
+@staff_required
+async def order_stream(request):
+    # Server-sent events; needs the ASGI entry point (config.asgi) so an
+    # open tab holds a coroutine rather than a worker thread. Under WSGI the
+    # response would be consumed to the end before sending anything, so
+    # answer 204, which tells EventSource to stop and the page to poll.
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(
+        event_stream(ORDER_CHANNEL, "order"),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -1,6 +1,8 @@
 from django.contrib import admin
 
+from .counters import adjust_status_count
 from .models import Order, OrderItem
+from .rollups import order_status_changed
 
 
 class OrderItemInline(admin.TabularInline):
@@ -17,3 +19,17 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ("id", "full_name", "phone", "email")
     ordering = ("-created_at",)
     inlines = [OrderItemInline]
+
+    def save_model(self, request, obj, form, change):
+        # New orders are counted by the post_save signal.
+        super().save_model(request, obj, form, change)
+        if change and "status" in form.changed_data:
+            adjust_status_count(form.initial["status"], -1)
+            adjust_status_count(obj.status, 1)
+
+    def save_related(self, request, form, formsets, change):
+        # Rollups read the order items, which are saved after the order.
+        super().save_related(request, form, formsets, change)
+        if not change or "status" in form.changed_data:
+            old_status = form.initial["status"] if change else None
+            order_status_changed(form.instance, old_status, form.instance.status)
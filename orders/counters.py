@@ -0,0 +1,74 @@
+import random
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import Order, OrderStatusCount
+from .rollups import order_status_changed
+
+# Rows per status; a write picks one at random, so up to this many
+# concurrent transactions can adjust the same status without waiting.
+STATUS_COUNT_SHARDS = 16
+
+
+def adjust_status_count(status, delta):
+    """
+    Add ``delta`` to one randomly chosen shard of ``status`` in a single
+    upsert. Must run inside the transaction that creates, moves or deletes
+    the order.
+    """
+    table = OrderStatusCount._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ("status", "shard", "count") VALUES (%s, %s, %s) '
+            f'ON CONFLICT ("status", "shard") DO UPDATE SET "count" = {table}."count" + EXCLUDED."count"',
+            [status, random.randrange(STATUS_COUNT_SHARDS), delta],
+        )
+
+
+def change_status(order, new_status):
+    """
+    Move ``order`` to ``new_status`` if nobody changed it in the meantime and
+    keep the status counters and sales rollups in step. Returns False when the order had already moved.
+    """
+    old_status = order.status
+    with transaction.atomic():
+        updated = Order.objects.filter(pk=order.pk, status=old_status).update(
+            status=new_status, updated_at=timezone.now()
+        )
+        if updated:
+            adjust_status_count(old_status, -1)
+            adjust_status_count(new_status, 1)
+            order_status_changed(order, old_status, new_status)
+    if updated:
+        order.status = new_status
+    return bool(updated)
+
+
+def get_status_counts():
+    counts = {key: 0 for key, _ in Order.STATUS_CHOICES}
+    counts.update(
+        OrderStatusCount.objects.order_by().values_list("status").annotate(total=Sum("count")).values_list("status", "total")
+    )
+    return counts
+
+
+def rebuild_status_counts():
+    """
+    Recount from the orders table. The counter table is locked against
+    writes first, so checkouts that are mid-flight either finish before the
+    recount or apply their adjustment on top of it afterwards.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {OrderStatusCount._meta.db_table} IN EXCLUSIVE MODE")
+        counts = {key: 0 for key, _ in Order.STATUS_CHOICES}
+        counts.update(
+            Order.objects.order_by().values_list("status").annotate(total=Count("id")).values_list("status", "total")
+        )
+        OrderStatusCount.objects.all().delete()
+        OrderStatusCount.objects.bulk_create([
+            OrderStatusCount(status=status, shard=0, count=count) for status, count in counts.items()
+        ])
+    return counts
@@ -0,0 +1,129 @@
+"""
+In-process publish/subscribe for order events.
+
+Publishers are plain sync code (signals, views); subscribers are async
+streaming views running under ASGI. The backend is chosen with the
+ORDER_EVENTS_BACKEND setting:
+
+- ``orders.events.LocalBroker`` delivers within the current process and is
+  what tests and single-worker deployments use.
+- ``orders.events.RedisBroker`` fans out across workers via Redis pub/sub
+  (requires the ``redis`` package and REDIS_URL).
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+ORDER_CHANNEL = "orders"
+
+_brokers = {}
+
+
+class LocalBroker:
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers[channel])
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:
+                # The subscriber's event loop is already closed.
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        queue = asyncio.Queue()
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers[channel].add(entry)
+        try:
+            yield queue
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(entry)
+
+
+class _RedisSubscription:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self):
+        while True:
+            message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if message is not None:
+                return json.loads(message["data"])
+
+
+class RedisBroker:
+    def __init__(self, url=None):
+        self.url = url or settings.REDIS_URL
+
+    def publish(self, channel, message):
+        import redis
+
+        client = redis.Redis.from_url(self.url)
+        try:
+            client.publish(channel, json.dumps(message))
+        finally:
+            client.close()
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        import redis.asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            yield _RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+            await client.aclose()
+
+
+def get_broker():
+    path = getattr(settings, "ORDER_EVENTS_BACKEND", "orders.events.LocalBroker")
+    broker = _brokers.get(path)
+    if broker is None:
+        broker = _brokers[path] = import_string(path)()
+    return broker
+
+
+def order_payload(order):
+    return {
+        "id": order.id,
+        "full_name": order.full_name,
+        "total": float(order.total),
+        "created_at": order.created_at.isoformat(),
+        "status": order.get_status_display(),
+    }
+
+
+def publish_order(order):
+    get_broker().publish(ORDER_CHANNEL, order_payload(order))
+
+
+async def event_stream(channel, event, heartbeat=15):
+    """
+    Server-sent events for one subscriber. Idle connections only emit a
+    comment line every ``heartbeat`` seconds and never touch the database.
+    """
+    async with get_broker().subscribe(channel) as subscription:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield f"event: {event}\ndata: {json.dumps(message)}\n\n"
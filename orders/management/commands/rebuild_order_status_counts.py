@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from orders.counters import rebuild_status_counts
+
+
+class Command(BaseCommand):
+    help = "Recount orders per status into the dashboard status counters."
+
+    def handle(self, *args, **options):
+        counts = rebuild_status_counts()
+        summary = ", ".join(f"{status}={count}" for status, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt order status counts: {summary}"))
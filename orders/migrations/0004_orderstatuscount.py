@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:11
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_status_counts(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderStatusCount = apps.get_model('orders', 'OrderStatusCount')
+    counts = Order.objects.order_by().values('status').annotate(total=Count('id'))
+    OrderStatusCount.objects.bulk_create([
+        OrderStatusCount(status=entry['status'], count=entry['total']) for entry in counts
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_stockhold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Chờ xử lý'), ('confirmed', 'Đã xác nhận'), ('shipping', 'Đang giao'), ('completed', 'Hoàn thành'), ('canceled', 'Đã hủy')], max_length=20, unique=True)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_status_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_orderstatuscount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('dimension', models.CharField(choices=[('all', 'Toàn cửa hàng'), ('product', 'Sản phẩm'), ('brand', 'Nhãn hàng'), ('category', 'Hạng mục'), ('payment', 'Thanh toán'), ('delivery', 'Giao nhận')], max_length=20)),
+                ('key', models.CharField(blank=True, max_length=50)),
+                ('orders', models.IntegerField(default=0)),
+                ('units', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dimension', 'day'], name='sales_rollup_dim_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'key', 'day'), name='unique_sales_rollup')],
+            },
+        ),
+    ]
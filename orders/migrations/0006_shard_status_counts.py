@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_salesrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderstatuscount',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='orderstatuscount',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Chờ xử lý'), ('confirmed', 'Đã xác nhận'), ('shipping', 'Đang giao'), ('completed', 'Hoàn thành'), ('canceled', 'Đã hủy')], max_length=20),
+        ),
+        migrations.AddConstraint(
+            model_name='orderstatuscount',
+            constraint=models.UniqueConstraint(fields=('status', 'shard'), name='order_status_count_shard'),
+        ),
+    ]
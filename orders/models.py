@@ -54,6 +54,12 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="order_created_idx"),
+            models.Index(fields=["status", "-created_at", "-id"], name="order_status_created_idx"),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} - {self.full_name}"
 
@@ -74,3 +80,88 @@ class OrderItem(models.Model):
 
     def __str__(self):
         return f"{self.order_id} - {self.product_name} x{self.quantity}"
+
+
+class StockHold(models.Model):
+    """
+    Time-limited reservation of one cart line, taken when checkout starts.
+    Product.reserved always equals the sum of quantities of existing holds.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="stock_holds",
+    )
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="stock_holds")
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "product"], name="unique_stock_hold"),
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"], name="stock_hold_expires_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}:{self.product_id} x{self.quantity}"
+
+
+class OrderStatusCount(models.Model):
+    """
+    Number of orders in each status, adjusted in the same transaction as the
+    order write (see orders.counters). Each status is spread over several
+    shard rows so concurrent checkouts don't queue on one row lock; the
+    count is their sum. Rebuild with ``manage.py rebuild_order_status_counts``
+    if it ever drifts.
+    """
+
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    shard = models.PositiveSmallIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["status", "shard"], name="order_status_count_shard"),
+        ]
+
+    def __str__(self):
+        return f"{self.status}[{self.shard}]: {self.count}"
+
+
+class SalesRollup(models.Model):
+    """
+    Completed-order totals for one local order date, split by a dimension
+    (the whole shop, a product, a brand, ...). Maintained by orders.rollups;
+    rebuild with ``manage.py backfill_sales_rollups``.
+    """
+
+    DIMENSION_CHOICES = [
+        ("all", "Toàn cửa hàng"),
+        ("product", "Sản phẩm"),
+        ("brand", "Nhãn hàng"),
+        ("category", "Hạng mục"),
+        ("payment", "Thanh toán"),
+        ("delivery", "Giao nhận"),
+    ]
+
+    day = models.DateField()
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=50, blank=True)
+    orders = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["dimension", "key", "day"], name="unique_sales_rollup"),
+        ]
+        indexes = [
+            models.Index(fields=["dimension", "day"], name="sales_rollup_dim_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.dimension}:{self.key}"
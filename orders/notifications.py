@@ -0,0 +1,47 @@
+from django.core.cache import cache
+from django.db.models import Max
+
+from .models import Order
+
+LATEST_ORDER_KEY = "orders:latest_id"
+LAST_SEEN_KEY = "orders:last_seen:{user_id}"
+# Advancing the watermark is a read-then-write, so two orders committing at
+# the same moment can leave it one order behind. The timeout bounds how
+# long such a miss can last; a refill is a single MAX(id) on the primary key.
+LATEST_ORDER_TIMEOUT = 60 * 5
+LAST_SEEN_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def get_latest_order_id():
+    latest_id = cache.get(LATEST_ORDER_KEY)
+    if latest_id is None:
+        latest_id = Order.objects.aggregate(latest=Max("id"))["latest"] or 0
+        cache.add(LATEST_ORDER_KEY, latest_id, LATEST_ORDER_TIMEOUT)
+    return latest_id
+
+
+def advance_latest_order_id(order_id):
+    # Transactions can commit out of id order; never move the watermark back.
+    latest_id = cache.get(LATEST_ORDER_KEY)
+    if latest_id is None or order_id > latest_id:
+        cache.set(LATEST_ORDER_KEY, order_id, LATEST_ORDER_TIMEOUT)
+
+
+def get_last_seen(user):
+    return cache.get(LAST_SEEN_KEY.format(user_id=user.pk))
+
+
+def set_last_seen(user, order_id):
+    cache.set(LAST_SEEN_KEY.format(user_id=user.pk), order_id, LAST_SEEN_TIMEOUT)
+
+
+def get_recent_orders(latest_id, limit=5):
+    """Payloads for the newest orders, shared by every staff member per watermark."""
+    from .events import order_payload
+
+    key = f"orders:recent:{latest_id}:{limit}"
+    orders = cache.get(key)
+    if orders is None:
+        orders = [order_payload(order) for order in Order.objects.order_by("-id")[:limit]]
+        cache.set(key, orders, LATEST_ORDER_TIMEOUT)
+    return orders
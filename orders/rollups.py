@@ -0,0 +1,159 @@
+"""
+Daily sales rollups for the dashboard.
+
+A completed order contributes to the rollup rows of the local date it was
+placed on: one "all" row, one row per product, brand and category it
+contains, and one row each for its payment and delivery method. Shop-wide,
+payment and delivery revenue is the order total (after shipping and
+discount); product, brand and category revenue is the sum of line totals.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Min, Sum
+from django.utils import timezone
+
+from .models import Order, OrderItem, SalesRollup
+
+COMPLETED = "completed"
+
+
+def _empty():
+    return [0, 0, Decimal("0")]
+
+
+def _contributions(order, items):
+    """
+    Rollup increments for one order as {(dimension, key): [orders, units, revenue]}.
+    ``items`` are (product_id, brand_id, category_id, quantity, total) tuples.
+    """
+    rows = defaultdict(_empty)
+    units = sum(item[3] for item in items)
+    for dimension, key in (("all", ""), ("payment", order.payment_method), ("delivery", order.delivery_method)):
+        row = rows[dimension, key]
+        row[0] += 1
+        row[1] += units
+        row[2] += order.total
+
+    for product_id, brand_id, category_id, quantity, total in items:
+        for dimension, key in (("product", product_id), ("brand", brand_id), ("category", category_id)):
+            row = rows[dimension, str(key)]
+            row[1] += quantity
+            row[2] += total
+    for (dimension, key), row in rows.items():
+        if dimension in ("product", "brand", "category"):
+            row[0] = 1
+    return rows
+
+
+def _order_items(order_ids):
+    items = defaultdict(list)
+    lines = OrderItem.objects.filter(order_id__in=order_ids).values_list(
+        "order_id", "product_id", "product__brand_id", "product__category_id", "quantity", "total"
+    )
+    for order_id, *item in lines:
+        items[order_id].append(tuple(item))
+    return items
+
+
+def _increment(day, rows, sign=1):
+    """Add ``rows`` onto the stored totals for ``day`` in one upsert."""
+    if not rows:
+        return
+    table = SalesRollup._meta.db_table
+    values = []
+    params = []
+    for (dimension, key), (orders, units, revenue) in rows.items():
+        values.append("(%s, %s, %s, %s, %s, %s)")
+        params.extend([day, dimension, key, sign * orders, sign * units, sign * revenue])
+    sql = (
+        f'INSERT INTO {table} ("day", "dimension", "key", "orders", "units", "revenue") '
+        f"VALUES {', '.join(values)} "
+        f'ON CONFLICT ("dimension", "key", "day") DO UPDATE SET '
+        f'"orders" = {table}."orders" + EXCLUDED."orders", '
+        f'"units" = {table}."units" + EXCLUDED."units", '
+        f'"revenue" = {table}."revenue" + EXCLUDED."revenue"'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def record_order(order, sign=1):
+    """
+    Add (or with ``sign=-1`` remove) a completed order's contribution.
+    Must run inside the transaction that changes the order.
+    """
+    items = _order_items([order.pk])[order.pk]
+    _increment(timezone.localdate(order.created_at), _contributions(order, items), sign)
+
+
+def order_status_changed(order, old_status, new_status):
+    if new_status == COMPLETED and old_status != COMPLETED:
+        record_order(order)
+    elif old_status == COMPLETED and new_status != COMPLETED:
+        record_order(order, sign=-1)
+
+
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def rebuild_day(day):
+    """
+    Recompute one day's rollups from the orders. The old rows are deleted
+    before the orders are read, so an order completing concurrently either
+    commits first (and is counted here) or applies its increment on top of
+    the rebuilt rows afterwards.
+    """
+    with transaction.atomic():
+        SalesRollup.objects.filter(day=day).delete()
+        start, end = _day_bounds(day)
+        orders = list(
+            Order.objects.filter(status=COMPLETED, created_at__gte=start, created_at__lt=end)
+            .only("id", "payment_method", "delivery_method", "total")
+        )
+        items = _order_items([order.pk for order in orders])
+        rows = defaultdict(_empty)
+        for order in orders:
+            for key, (count, units, revenue) in _contributions(order, items[order.pk]).items():
+                row = rows[key]
+                row[0] += count
+                row[1] += units
+                row[2] += revenue
+        _increment(day, rows)
+    return len(orders)
+
+
+def first_order_day():
+    first = Order.objects.aggregate(first=Min("created_at"))["first"]
+    return timezone.localdate(first) if first else None
+
+
+def read_series(start, end, dimension="all", key=""):
+    """Daily totals for [start, end] as a list of (day, orders, units, revenue), zero-filled."""
+    stored = {
+        row[0]: row[1:]
+        for row in SalesRollup.objects.filter(dimension=dimension, key=key, day__range=(start, end))
+        .values_list("day", "orders", "units", "revenue")
+    }
+    series = []
+    day = start
+    while day <= end:
+        orders, units, revenue = stored.get(day, (0, 0, Decimal("0")))
+        series.append((day, orders, units, revenue))
+        day += timedelta(days=1)
+    return series
+
+
+def read_top(start, end, dimension, limit=5):
+    """Best keys of ``dimension`` by revenue over [start, end]."""
+    return list(
+        SalesRollup.objects.filter(dimension=dimension, day__range=(start, end))
+        .values("key")
+        .annotate(orders=Sum("orders"), units=Sum("units"), revenue=Sum("revenue"))
+        .filter(revenue__gt=0)
+        .order_by("-revenue", "key")[:limit]
+    )
@@ -0,0 +1,38 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .counters import adjust_status_count
+from .events import publish_order
+from .models import Order
+from .rollups import COMPLETED, record_order
+from .notifications import advance_latest_order_id
+
+
+@receiver(post_save, sender=Order)
+def announce_new_order(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        transaction.on_commit(partial(advance_latest_order_id, instance.pk))
+        transaction.on_commit(partial(publish_order, instance))
+
+
+@receiver(post_save, sender=Order)
+def count_new_order(sender, instance, created=False, raw=False, **kwargs):
+    # Runs inside the caller's transaction (place_order, the admin), so the
+    # counter commits or rolls back with the order row.
+    if created and not raw:
+        adjust_status_count(instance.status, 1)
+
+
+@receiver(post_delete, sender=Order)
+def uncount_deleted_order(sender, instance, **kwargs):
+    adjust_status_count(instance.status, -1)
+
+
+@receiver(pre_delete, sender=Order)
+def unrecord_deleted_sale(sender, instance, **kwargs):
+    # pre_delete: the order items are still there to be subtracted.
+    if instance.status == COMPLETED:
+        record_order(instance, sign=-1)
@@ -1,3 +1,155 @@
-from django.test import TestCase
+import asyncio
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from products.models import Brand, Category, Product
+
+from .counters import adjust_status_count, change_status, get_status_counts, rebuild_status_counts
+from .events import ORDER_CHANNEL, event_stream, get_broker
+from .models import Order, OrderItem, OrderStatusCount, SalesRollup
+from .rollups import rebuild_day
+
+
+@override_settings(ORDER_EVENTS_BACKEND="orders.events.LocalBroker")
+class OrderEventTests(TestCase):
+    def _create_order(self):
+        return Order.objects.create(full_name="Khách hàng", phone="0900000000", total=Decimal("1500000"))
+
+    def test_stream_delivers_order_created_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            order = self._create_order()
+
+        async def first_event():
+            stream = event_stream(ORDER_CHANNEL, "order", heartbeat=5)
+            try:
+                self.assertEqual(await stream.__anext__(), "retry: 5000\n\n")
+                pending = asyncio.ensure_future(stream.__anext__())
+                await asyncio.sleep(0)
+                for callback in callbacks:
+                    callback()
+                return await asyncio.wait_for(pending, 5)
+            finally:
+                await stream.aclose()
+
+        chunk = asyncio.run(first_event())
+
+        self.assertTrue(chunk.startswith("event: order\n"))
+        self.assertIn(f'"id": {order.id}', chunk)
+
+    def test_nothing_published_until_commit(self):
+        received = []
+        broker = get_broker()
+        broker.publish = lambda channel, message: received.append(message)
+        try:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                self._create_order()
+            self.assertEqual(received, [])
+            for callback in callbacks:
+                callback()
+        finally:
+            del broker.publish
+        self.assertEqual(len(received), 1)
+
+
+class OrderStatusCountTests(TestCase):
+    def _create_order(self, status="pending"):
+        return Order.objects.create(full_name="Khách hàng", phone="0900000000", status=status)
+
+    def test_shards_sum_to_the_status_count(self):
+        for _ in range(40):
+            adjust_status_count("shipping", 1)
+
+        self.assertEqual(get_status_counts()["shipping"], 40)
+        self.assertGreater(OrderStatusCount.objects.filter(status="shipping").count(), 1)
+
+    def test_transition_moves_one_order_between_counters(self):
+        order = self._create_order()
+        self._create_order()
+
+        self.assertTrue(change_status(order, "confirmed"))
+
+        counts = get_status_counts()
+        self.assertEqual((counts["pending"], counts["confirmed"]), (1, 1))
+
+    def test_stale_transition_is_ignored(self):
+        order = self._create_order()
+        stale = Order.objects.get(pk=order.pk)
+        change_status(order, "confirmed")
+
+        self.assertFalse(change_status(stale, "confirmed"))
+        self.assertEqual(get_status_counts()["confirmed"], 1)
+
+    def test_delete_and_rebuild(self):
+        self._create_order().delete()
+        self._create_order("completed")
+        Order.objects.filter(status="completed").update(status="canceled")
+
+        self.assertEqual(get_status_counts()["pending"], 0)
+        counts = rebuild_status_counts()
+
+        self.assertEqual((counts["completed"], counts["canceled"]), (0, 1))
+        self.assertEqual(get_status_counts(), counts)
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Điện thoại", slug="dien-thoai")
+        brand = Brand.objects.create(name="TechOne", category=category)
+        # No file behind the image; mark it processed so saves skip variants.
+        variants = {"source": "products/test.png", "hash": "0" * 20, "sizes": []}
+        self.phone = Product.objects.create(
+            name="Phone", slug="phone", brand=brand, category=category,
+            price=Decimal("300"), stock=10, description="", image="products/test.png",
+            image_variants=variants,
+        )
+        self.case = Product.objects.create(
+            name="Case", slug="case", brand=brand, category=category,
+            price=Decimal("50"), stock=10, description="", image="products/test.png",
+            image_variants=variants,
+        )
+
+    def _create_order(self, *lines, shipping=Decimal("20")):
+        subtotal = sum(product.price * quantity for product, quantity in lines)
+        order = Order.objects.create(
+            full_name="Khách hàng", phone="0900000000", payment_method="bank",
+            subtotal=subtotal, shipping=shipping, total=subtotal + shipping,
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, product_name=product.name, price=product.price,
+                      quantity=quantity, total=product.price * quantity)
+            for product, quantity in lines
+        ])
+        return order
+
+    def _rows(self):
+        return {
+            (row.dimension, row.key): (row.orders, row.units, row.revenue)
+            for row in SalesRollup.objects.exclude(orders=0, units=0, revenue=0)
+        }
+
+    def test_completion_adds_and_reopening_removes(self):
+        order = self._create_order((self.phone, 1), (self.case, 2))
+        self._create_order((self.phone, 1))
+        self.assertEqual(self._rows(), {})
+
+        change_status(order, "completed")
+
+        rows = self._rows()
+        self.assertEqual(rows["all", ""], (1, 3, Decimal("420")))
+        self.assertEqual(rows["payment", "bank"], (1, 3, Decimal("420")))
+        self.assertEqual(rows["product", str(self.case.pk)], (1, 2, Decimal("100")))
+        self.assertEqual(rows["brand", str(self.phone.brand_id)], (1, 3, Decimal("400")))
+
+        change_status(order, "canceled")
+        self.assertEqual(self._rows(), {})
+
+    def test_rebuild_matches_incremental_totals(self):
+        for lines in (((self.phone, 2),), ((self.phone, 1), (self.case, 1))):
+            change_status(self._create_order(*lines), "completed")
+        incremental = self._rows()
+
+        self.assertEqual(rebuild_day(timezone.localdate()), 2)
+
+        self.assertEqual(self._rows(), incremental)
@@ -0,0 +1,110 @@
+"""
+Resized WebP/JPEG variants of product images.
+
+Variants are named after a hash of the original's bytes
+(``products/variants/<hash>-<width>.<ext>``), so identical uploads share
+files and a URL never changes content. Product.image_variants records
+which original they were built from and the sizes that exist:
+
+    {"source": "products/x.png", "hash": "3f2a...", "sizes": [[240, 240], [480, 480]]}
+"""
+import hashlib
+import io
+import logging
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (120, 240, 480, 960)
+VARIANT_FORMATS = {
+    "webp": ("WEBP", {"quality": 80}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+VARIANT_DIR = "products/variants"
+
+
+def variant_name(digest, width, ext):
+    return f"{VARIANT_DIR}/{digest}-{width}.{ext}"
+
+
+def _flatten(image):
+    # JPEG has no alpha channel; composite onto white instead of black.
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def _encode(image, ext):
+    fmt, options = VARIANT_FORMATS[ext]
+    if ext == "jpeg":
+        image = _flatten(image)
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def build_variants(image_field, storage=default_storage):
+    """
+    Write the variants for ``image_field`` (skipping files that already
+    exist) and return the dict to store in Product.image_variants.
+    """
+    with image_field.open("rb") as source:
+        data = source.read()
+    digest = hashlib.sha256(data).hexdigest()[:20]
+
+    original = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    # Never upscale: small originals get their own width as the largest variant.
+    widths = [width for width in VARIANT_WIDTHS if width < original.width]
+    if original.width <= VARIANT_WIDTHS[-1]:
+        widths.append(original.width)
+
+    sizes = []
+    for width in widths:
+        height = max(1, round(original.height * width / original.width))
+        resized = None
+        for ext in VARIANT_FORMATS:
+            name = variant_name(digest, width, ext)
+            if storage.exists(name):
+                continue
+            if resized is None:
+                resized = original.resize((width, height), Image.Resampling.LANCZOS)
+            storage.save(name, ContentFile(_encode(resized, ext)))
+        sizes.append([width, height])
+    return {"source": image_field.name, "hash": digest, "sizes": sizes}
+
+
+def needs_variants(product):
+    return bool(product.image) and product.image_variants.get("source") != product.image.name
+
+
+def refresh_variants(product):
+    """Build variants if the image changed since they were last built. Returns True if rebuilt."""
+    if not needs_variants(product):
+        return False
+    try:
+        variants = build_variants(product.image)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        logger.warning("Could not build image variants for product %s (%s)", product.pk, product.image.name)
+        return False
+    product.image_variants = variants
+    type(product).objects.filter(pk=product.pk).update(image_variants=variants, updated_at=timezone.now())
+    return True
+
+
+def variant_srcset(product, ext):
+    variants = product.image_variants
+    if variants.get("source") != product.image.name:
+        return ""
+    return ", ".join(
+        f"{default_storage.url(variant_name(variants['hash'], width, ext))} {width}w"
+        for width, _ in variants["sizes"]
+    )
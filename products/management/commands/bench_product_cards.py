@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from products.models import Brand, Category, Product
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic catalog inside a transaction that is rolled back, then compare "
+        "full Product rows with Product.objects.cards() for a listing page: bytes read "
+        "from Postgres and time to build the model instances."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=20_000)
+        parser.add_argument("--page-size", type=int, default=24)
+        parser.add_argument("--pages", type=int, default=50)
+        parser.add_argument("--text-size", type=int, default=4000, help="Characters of description and of specifications.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                category = self._seed(options["products"], options["text_size"])
+                self._compare(category, options["page_size"], options["pages"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, count, text_size):
+        category = Category.objects.create(name="Bench", slug="bench-product-cards")
+        brand = Brand.objects.create(name="Bench", category=category)
+        filler = "Thông số kỹ thuật chi tiết. " * (text_size // 28 + 1)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Product._meta.db_table}
+                    (name, slug, brand_id, category_id, price, stock, reserved, description,
+                     specifications, image, image_variants, is_active, is_featured,
+                     created_at, updated_at, search_vector)
+                SELECT 'Bench product ' || n, 'bench-product-' || n, %s, %s, 1000000 + n, 10, 0,
+                       left(%s, %s), left(%s, %s), 'products/bench.jpg', '{{}}', true, n %% 10 = 0,
+                       now(), now(), to_tsvector('simple', left(%s, %s))
+                FROM generate_series(1, %s) AS n
+                """,
+                [brand.pk, category.pk, filler, text_size, filler, text_size, filler, text_size, count],
+            )
+            cursor.execute(f"ANALYZE {Product._meta.db_table}")
+        return category
+
+    def _page_bytes(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COALESCE(SUM(pg_column_size(page.*)), 0) FROM ({sql}) AS page", params)
+            return cursor.fetchone()[0]
+
+    def _compare(self, category, page_size, pages):
+        listing = Product.objects.filter(category=category, is_active=True).order_by("-created_at", "-id")
+        self.stdout.write(f"{'rows':<8} {'KB/page':>9} {'ms/page':>9}")
+        for label, queryset in (("full", listing), ("cards", listing.cards())):
+            kilobytes = self._page_bytes(queryset[:page_size]) / 1024
+            started = time.perf_counter()
+            for page in range(pages):
+                list(queryset[page * page_size:(page + 1) * page_size])
+            elapsed = (time.perf_counter() - started) * 1000 / pages
+            self.stdout.write(f"{label:<8} {kilobytes:>9.1f} {elapsed:>9.2f}")
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from products.images import needs_variants, refresh_variants
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the resized WebP/JPEG variants for products whose image has none yet. "
+        "Safe to re-run; existing variant files are reused."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--force", action="store_true", help="Rebuild variants for every product.")
+
+    def handle(self, *args, **options):
+        built = skipped = 0
+        last_id = 0
+        while True:
+            batch = list(
+                Product.objects.filter(id__gt=last_id)
+                .exclude(image="")
+                .order_by("id")
+                .only("id", "image", "image_variants")[: options["batch_size"]]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            for product in batch:
+                if options["force"]:
+                    product.image_variants = {}
+                if not needs_variants(product):
+                    continue
+                if refresh_variants(product):
+                    built += 1
+                else:
+                    skipped += 1
+        self.stdout.write(self.style.SUCCESS(f"Built variants for {built} products ({skipped} unreadable)."))
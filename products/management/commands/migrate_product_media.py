@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from products.models import Product
+from products.storage import is_content_addressed, product_image_storage, release_image
+
+
+class Command(BaseCommand):
+    help = (
+        "Move product images into content-addressed storage, merging identical files. "
+        "Old files are deleted once no product refers to them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        storage = product_image_storage
+        moved = missing = 0
+        replaced = set()
+        stored = set()
+        last_id = 0
+        while True:
+            batch = list(
+                Product.objects.filter(id__gt=last_id)
+                .exclude(image="")
+                .order_by("id")
+                .only("id", "image", "image_variants")[: options["batch_size"]]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            for product in batch:
+                old_name = product.image.name
+                if is_content_addressed(old_name):
+                    continue
+                try:
+                    # Save and re-point in one transaction (products.storage).
+                    with transaction.atomic(), storage.open(old_name, "rb") as source:
+                        new_name = storage.save(old_name, source)
+                        variants = product.image_variants
+                        if variants.get("source") == old_name:
+                            # Same bytes, so the existing variants stay valid.
+                            variants = {**variants, "source": new_name}
+                        Product.objects.filter(pk=product.pk, image=old_name).update(
+                            image=new_name, image_variants=variants, updated_at=timezone.now()
+                        )
+                except FileNotFoundError:
+                    missing += 1
+                    continue
+                replaced.add(old_name)
+                stored.add(new_name)
+                moved += 1
+
+        deleted = sum(release_image(name) for name in sorted(replaced))
+        self.stdout.write(self.style.SUCCESS(
+            f"Moved {moved} product images into {len(stored)} files; "
+            f"deleted {deleted} old files, {missing} images were missing."
+        ))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from products.models import Product
+from products.search import reindex_products
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search vector of every product."
+
+    def handle(self, *args, **options):
+        count = reindex_products(Product.objects.order_by("id"))
+        self.stdout.write(self.style.SUCCESS(f"Reindexed {count} products."))
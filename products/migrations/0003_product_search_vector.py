@@ -0,0 +1,53 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:00
+
+import unicodedata
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import Value
+
+
+# A frozen copy of products.search as of this migration, so later changes
+# there don't alter history; run reindex_products to apply newer rules.
+def fold_text(value):
+    if not value:
+        return ''
+    value = str(value).replace('đ', 'd').replace('Đ', 'D')
+    decomposed = unicodedata.normalize('NFD', value)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return unicodedata.normalize('NFC', stripped).lower()
+
+
+def backfill_search_vector(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    for product in Product.objects.select_related('brand', 'category').iterator():
+        vector = (
+            SearchVector(Value(fold_text(product.name)), weight='A', config='simple')
+            + SearchVector(Value(fold_text(product.brand.name)), weight='B', config='simple')
+            + SearchVector(Value(fold_text(product.category.name)), weight='B', config='simple')
+            + SearchVector(Value(fold_text(product.specifications)), weight='C', config='simple')
+            + SearchVector(Value(fold_text(product.description)), weight='D', config='simple')
+        )
+        Product.objects.filter(pk=product.pk).update(search_vector=vector)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_brand_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='product_search_vector_gin'),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
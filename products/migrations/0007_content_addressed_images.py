@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:18
+
+import products.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='image',
+            field=models.ImageField(storage=products.storage.ContentAddressedStorage(), upload_to='products/'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['image'], name='product_image_idx'),
+        ),
+    ]
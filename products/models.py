@@ -1,6 +1,10 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils.text import slugify
 
+from .storage import product_image_storage
+
 
 class Brand(models.Model):
     name = models.CharField(max_length=100)
@@ -13,6 +17,7 @@ class Brand(models.Model):
 class Category(models.Model):
     name = models.CharField(max_length=100)
     slug = models.SlugField(unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -23,6 +28,25 @@ class Category(models.Model):
         return self.name
 
 
+# Columns a product card (storefront listings, cart lines) renders;
+# updated_at versions the cached card markup (core.templatetags.product_cards).
+PRODUCT_CARD_FIELDS = ("id", "name", "slug", "price", "old_price", "image", "image_variants", "updated_at")
+
+
+class ProductQuerySet(models.QuerySet):
+    def cards(self, *fields, with_brand=False):
+        """
+        Load only what a product card shows, leaving description,
+        specifications and the search vector unread. ``fields`` adds the
+        columns a particular listing needs on top (sort keys, stock...).
+        """
+        queryset = self
+        if with_brand:
+            queryset = queryset.select_related("brand")
+            fields += ("brand__name",)
+        return queryset.only(*PRODUCT_CARD_FIELDS, *fields)
+
+
 class Product(models.Model):
     name = models.CharField(max_length=255)
     slug = models.SlugField(unique=True)
@@ -34,15 +58,48 @@ class Product(models.Model):
     old_price = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
 
     stock = models.PositiveIntegerField()
+    # Units held by active checkout reservations (orders.StockHold); kept in
+    # step with the holds table so availability never needs to scan it.
+    reserved = models.PositiveIntegerField(default=0, editable=False)
 
     description = models.TextField()
     specifications = models.TextField(blank=True)
 
-    image = models.ImageField(upload_to='products/')
+    # Stored by content hash; see products.storage.
+    image = models.ImageField(upload_to='products/', storage=product_image_storage)
+    # Resized WebP/JPEG copies of ``image``; see products.images.
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     is_active = models.BooleanField(default=True)
     is_featured = models.BooleanField(default=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by anything that changes the product page (conditional GET
+    # validator); stock and reservation updates deliberately leave it alone.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Folded (accent-insensitive) name/brand/category/specs, kept in sync by
+    # products.signals; see products.search.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="product_search_vector_gin"),
+            # Dashboard list: each sort key ends with id for keyset paging.
+            models.Index(fields=["-created_at", "-id"], name="product_created_idx"),
+            models.Index(fields=["category", "-created_at", "-id"], name="product_cat_created_idx"),
+            models.Index(fields=["brand", "-created_at", "-id"], name="product_brand_created_idx"),
+            models.Index(fields=["name", "id"], name="product_name_idx"),
+            models.Index(fields=["price", "id"], name="product_price_idx"),
+            models.Index(fields=["stock", "id"], name="product_stock_idx"),
+            # Reference counting of shared image files (products.storage).
+            models.Index(fields=["image"], name="product_image_idx"),
+        ]
 
     def __str__(self):
         return self.name
+
+    @property
+    def available_stock(self):
+        return max(self.stock - self.reserved, 0)
@@ -0,0 +1,83 @@
+import re
+import unicodedata
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, Value
+
+SEARCH_CONFIG = "simple"
+SEARCH_FIELDS = ("name", "brand", "category", "specifications", "description")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def fold_text(value):
+    """
+    Lowercase and strip Vietnamese diacritics so "Điện thoại" and
+    "dien thoai" index to the same terms.
+    """
+    if not value:
+        return ""
+    value = str(value).replace("đ", "d").replace("Đ", "D")
+    decomposed = unicodedata.normalize("NFD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return unicodedata.normalize("NFC", stripped).lower()
+
+
+def tokenize(value):
+    return _TOKEN_RE.findall(fold_text(value))
+
+
+def _weighted(text, weight):
+    return SearchVector(Value(fold_text(text)), weight=weight, config=SEARCH_CONFIG)
+
+
+def build_search_vector(product):
+    return (
+        _weighted(product.name, "A")
+        + _weighted(product.brand.name, "B")
+        + _weighted(product.category.name, "B")
+        + _weighted(product.specifications, "C")
+        + _weighted(product.description, "D")
+    )
+
+
+def update_search_vector(product):
+    type(product)._default_manager.filter(pk=product.pk).update(
+        search_vector=build_search_vector(product)
+    )
+
+
+def reindex_products(queryset):
+    count = 0
+    for product in queryset.select_related("brand", "category").iterator():
+        update_search_vector(product)
+        count += 1
+    return count
+
+
+def build_search_query(query):
+    terms = tokenize(query)
+    if not terms:
+        return None
+    # Prefix match each term so "iph 16" still finds "iPhone 16 Pro".
+    raw = " & ".join(f"{term}:*" for term in terms)
+    return SearchQuery(raw, search_type="raw", config=SEARCH_CONFIG)
+
+
+def match_products(queryset, query):
+    """Filter by the search index without imposing a relevance order."""
+    search_query = build_search_query(query)
+    if search_query is None:
+        return queryset.none()
+    return queryset.filter(search_vector=search_query)
+
+
+def search_products(queryset, query):
+    search_query = build_search_query(query)
+    if search_query is None:
+        return queryset.none()
+    return (
+        queryset.filter(search_vector=search_query)
+        .annotate(rank=SearchRank(F("search_vector"), search_query))
+        .order_by("-rank", "-id")
+    )
@@ -0,0 +1,48 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .images import refresh_variants
+from .models import Brand, Category, Product
+from .search import SEARCH_FIELDS, reindex_products, update_search_vector
+from .storage import release_image
+
+
+@receiver(post_save, sender=Product)
+def sync_product_search_vector(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(SEARCH_FIELDS):
+        return
+    update_search_vector(instance)
+
+
+@receiver(post_save, sender=Product)
+def sync_product_image_variants(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and "image" not in update_fields:
+        return
+    refresh_variants(instance)
+
+
+@receiver(post_delete, sender=Product)
+def release_product_image(sender, instance, **kwargs):
+    # The file may be shared with other products; release_image checks.
+    transaction.on_commit(partial(release_image, instance.image.name, instance.image_variants))
+
+
+@receiver(post_save, sender=Brand)
+def sync_brand_products(sender, instance, raw=False, created=False, **kwargs):
+    if raw or created:
+        return
+    reindex_products(Product.objects.filter(brand=instance))
+
+
+@receiver(post_save, sender=Category)
+def sync_category_products(sender, instance, raw=False, created=False, **kwargs):
+    if raw or created:
+        return
+    reindex_products(Product.objects.filter(category=instance))
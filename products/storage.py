@@ -0,0 +1,114 @@
+"""
+Content-addressed storage for product uploads.
+
+An upload is stored as ``<upload_to>/<aa>/<sha256>.<ext>``, so saving the
+same bytes twice returns the existing file instead of writing a renamed
+copy. Several products may then point at one file; release_image() deletes
+it only once no product references it any more. Both take an advisory lock
+on the content hash, so a release cannot delete a file that an identical,
+not yet committed upload has just been pointed at.
+
+Because a name always maps to the same bytes, these files (and the
+variants in products.images) can be cached forever: see
+CONTENT_ADDRESSED_CACHE_CONTROL and products.views.serve_media. Front-end web
+servers serving MEDIA_ROOT directly should send the same header for
+/media/products/.
+"""
+import hashlib
+import posixpath
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import connection, transaction
+from django.utils.deconstruct import deconstructible
+
+from .images import VARIANT_DIR, variant_name
+
+CONTENT_ADDRESSED_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_HASHED_NAME = re.compile(r"(^|/)[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})\.[\w]+$")
+
+
+def is_content_addressed(name):
+    return bool(_HASHED_NAME.search(name))
+
+
+def lock_content(digest):
+    """
+    Take a transaction-level advisory lock on a content hash (a full
+    sha256 or the shorter variants hash; both share the leading digits).
+    Held until the surrounding transaction ends.
+    """
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [int(digest[:15], 16)])
+
+
+def is_immutable_media(name):
+    return is_content_addressed(name) or name.startswith(f"{VARIANT_DIR}/")
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def hashed_name(self, name, content):
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()
+        digest = content_hash(content)
+        return posixpath.join(directory, digest[:2], f"{digest}{extension}")
+
+    def save(self, name, content, max_length=None):
+        # Call inside the transaction that stores the reference to the file:
+        # the lock taken here keeps release_image() from deleting an existing
+        # file this upload resolves to until that reference is committed.
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        lock_content(_HASHED_NAME.search(name).group("digest"))
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+product_image_storage = ContentAddressedStorage()
+
+
+def release_image(name, variants=None, storage=None):
+    """
+    Delete an image file (and its resized variants) if no product uses it.
+    Call after the transaction that dropped the reference has committed.
+    Returns True if the file was deleted.
+    """
+    from .models import Product
+
+    if not name:
+        return False
+    variants = variants or {}
+    match = _HASHED_NAME.search(name)
+    digest = match.group("digest") if match else variants.get("hash")
+    with transaction.atomic():
+        if digest:
+            lock_content(digest)
+        if Product.objects.filter(image=name).exists():
+            return False
+        (storage or product_image_storage).delete(name)
+
+        # Variants are keyed by content, so a not yet migrated copy of the
+        # same bytes under another name may still be using them.
+        if variants.get("hash") and not Product.objects.filter(image_variants__hash=variants["hash"]).exists():
+            for width, _ in variants.get("sizes", []):
+                for ext in ("webp", "jpeg"):
+                    default_storage.delete(variant_name(variants["hash"], width, ext))
+    return True
@@ -1,3 +1,174 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+import threading
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from PIL import Image
+
+from .images import refresh_variants, variant_name
+from .storage import is_content_addressed, release_image
+from .models import Brand, Category, Product
+from .search import search_products
+
+
+def png_upload(name="phone.png", size=(600, 400)):
+    buffer = io.BytesIO()
+    Image.new("RGBA", size, (200, 30, 60, 128)).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class ProductMediaMixin:
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        category = Category.objects.create(name="Điện thoại", slug="dien-thoai")
+        self.brand = Brand.objects.create(name="TechOne", category=category)
+        self.category = category
+
+    def _create(self, slug, upload):
+        return Product.objects.create(
+            name=f"Product {slug}", slug=slug, brand=self.brand, category=self.category,
+            price=Decimal("1000"), stock=1, description="", image=upload,
+        )
+
+
+class ProductMediaTestCase(ProductMediaMixin, TestCase):
+    pass
+
+
+class ImageVariantTests(ProductMediaTestCase):
+    def test_upload_builds_webp_and_jpeg_without_upscaling(self):
+        product = self._create("phone", png_upload())
+
+        variants = product.image_variants
+        self.assertEqual(variants["sizes"], [[120, 80], [240, 160], [480, 320], [600, 400]])
+        for width, _ in variants["sizes"]:
+            for ext in ("webp", "jpeg"):
+                self.assertTrue(default_storage.exists(variant_name(variants["hash"], width, ext)))
+        self.assertFalse(refresh_variants(product))
+
+    def test_decompression_bomb_is_skipped(self):
+        with mock.patch.object(Image, "MAX_IMAGE_PIXELS", 1000), self.assertLogs("products.images", "WARNING"):
+            product = self._create("bomb", png_upload())
+
+        self.assertEqual(Product.objects.get(pk=product.pk).image_variants, {})
+
+    def test_template_tag_emits_srcset(self):
+        product = self._create("tagged", png_upload())
+
+        html = Template('{% load product_images %}{% product_image product "240px" %}').render(
+            Context({"product": product})
+        )
+
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn(f"{product.image_variants['hash']}-240.webp 240w", html)
+        self.assertIn('sizes="240px"', html)
+        self.assertIn('width="600" height="400"', html)
+
+
+class ContentAddressedStorageTests(ProductMediaTestCase):
+    def test_identical_uploads_share_one_file(self):
+        first = self._create("first", png_upload("a.png"))
+        second = self._create("second", png_upload("b.png"))
+
+        self.assertTrue(is_content_addressed(first.image.name))
+        self.assertEqual(first.image.name, second.image.name)
+
+    def test_shared_file_survives_until_last_product_is_deleted(self):
+        first = self._create("first", png_upload("a.png"))
+        second = self._create("second", png_upload("b.png"))
+        name = first.image.name
+        thumbnail = variant_name(first.image_variants["hash"], 240, "webp")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(default_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(default_storage.exists(thumbnail))
+
+
+
+@skipUnless(connection.vendor == "postgresql", "uses advisory locks")
+class ImageReleaseRaceTests(ProductMediaMixin, TransactionTestCase):
+    def test_release_waits_for_uncommitted_identical_upload(self):
+        old = self._create("old", png_upload("a.png"))
+        name = old.image.name
+        with mock.patch("products.signals.release_image"):
+            old.delete()
+        uploaded = threading.Event()
+
+        def upload_identical_file():
+            try:
+                with transaction.atomic():
+                    self._create("new", png_upload("b.png"))
+                    uploaded.set()
+                    # Still uncommitted while release_image runs.
+                    threading.Event().wait(0.5)
+            finally:
+                connection.close()
+
+        uploader = threading.Thread(target=upload_identical_file)
+        uploader.start()
+        self.assertTrue(uploaded.wait(10))
+        released = release_image(name, old.image_variants)
+        uploader.join()
+
+        self.assertFalse(released)
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(Product.objects.get(slug="new").image.name, name)
+
+
+class ProductCardQueryTests(TestCase):
+    def test_cards_leave_large_columns_unread(self):
+        category = Category.objects.create(name="Điện thoại", slug="dien-thoai")
+        brand = Brand.objects.create(name="TechOne", category=category)
+        Product.objects.create(
+            name="Card", slug="card", brand=brand, category=category, price=Decimal("1000"),
+            stock=1, description="x" * 5000, specifications="y" * 5000, image="products/card.png",
+            image_variants={"source": "products/card.png", "hash": "0" * 20, "sizes": []},
+        )
+
+        with self.assertNumQueries(1):
+            product = Product.objects.cards(with_brand=True).get(slug="card")
+            self.assertEqual((product.name, product.brand.name), ("Card", "TechOne"))
+        self.assertTrue({"description", "specifications", "search_vector"} <= product.get_deferred_fields())
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Điện thoại", slug="dien-thoai")
+        brand = Brand.objects.create(name="Apple", category=category)
+        for name, slug in (("iPhone 16 Pro", "iphone-16-pro"), ("Ốp lưng iPhone", "op-lung")):
+            Product.objects.create(
+                name=name, slug=slug, brand=brand, category=category, price=Decimal("1000"),
+                stock=1, description="", image="products/test.png",
+                image_variants={"source": "products/test.png", "hash": "0" * 20, "sizes": []},
+            )
+
+    def _search(self, query):
+        return [product.slug for product in search_products(Product.objects.all(), query)]
+
+    def test_unaccented_query_matches_accented_text(self):
+        for query in ("dien thoai", "Điện Thoại", "DIEN THOAI", "op lung"):
+            self.assertTrue(self._search(query), query)
+        self.assertEqual(self._search("op lung"), ["op-lung"])
+
+    def test_every_term_matches_as_a_prefix(self):
+        self.assertEqual(self._search("iph 16"), ["iphone-16-pro"])
+        self.assertEqual(sorted(self._search("iph")), ["iphone-16-pro", "op-lung"])
+        self.assertEqual(self._search("iph 17"), [])
+        self.assertEqual(self._search("  !! "), [])
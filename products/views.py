@@ -1,3 +1,11 @@
-from django.shortcuts import render
+from django.views.static import serve
 
-# Create your views here.
+from .storage import CONTENT_ADDRESSED_CACHE_CONTROL, is_immutable_media
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """Development media server; content-addressed files are cached forever."""
+    response = serve(request, path, document_root=document_root, show_indexes=show_indexes)
+    if is_immutable_media(path):
+        response["Cache-Control"] = CONTENT_ADDRESSED_CACHE_CONTROL
+    return response